@@ -1,28 +1,76 @@
-# ./AI/AI_funcs_claude.py
-import anthropic
+import threading
+from typing import Iterator, Optional
+
 from APIs import CLAUDE_API
 
-from prompts import prompt
+from AI.llm_client import LLMProvider
 
+CLAUDE_MODEL_NAME = "claude-3-opus-20240229"
+CLAUDE_MAX_TOKENS = 2418
 
-# Create a function to generate responses using Chat GPT API
-def generate_response(artists_output: str, weekend_input: str):
-    full_prompt = prompt
-    full_prompt += f"\nTomorrowland Festival Lineup:\n" + artists_output + "\n" + str(weekend_input)
-    # print(full_prompt)
-    try:
 
-        client = anthropic.Anthropic(
-            # defaults to os.environ.get("ANTHROPIC_API_KEY")
-            api_key=CLAUDE_API,
-        )
-        message = client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=2418,
+class ClaudeProvider(LLMProvider):
+    name = "claude"
+
+    def __init__(self, api_key: str = CLAUDE_API, model_name: str = CLAUDE_MODEL_NAME,
+                 max_tokens: int = CLAUDE_MAX_TOKENS):
+        """
+        Anthropic client, created once and shared by all the requests. Its HTTP connections are reused.
+        The SDK is imported and the client created on the first request, to keep the bot's startup fast.
+
+        Args:
+            api_key (str): The Anthropic API key.
+            model_name (str): The Claude model.
+            max_tokens (int): The maximal number of tokens of a response.
+        """
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        with self._client_lock:
+            if self._client is None:
+                import anthropic
+
+                self._client = anthropic.Anthropic(api_key=self.api_key)
+            return self._client
+
+    def generate(self, prompt: str) -> str:
+        message = self.client.messages.create(
+            model=self.model_name,
+            max_tokens=self.max_tokens,
             messages=[
-                {"role": "user", "content": full_prompt}
+                {"role": "user", "content": prompt}
             ]
         )
-        return message.content
-    except Exception as e:
-        return str(e)
+        return "".join(block.text for block in message.content if block.type == "text")
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        with self.client.messages.stream(
+            model=self.model_name,
+            max_tokens=self.max_tokens,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            yield from stream.text_stream
+
+
+_provider: Optional[ClaudeProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> ClaudeProvider:
+    """
+    Get the shared Claude provider, created on first use.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = ClaudeProvider()
+        return _provider
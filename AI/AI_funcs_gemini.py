@@ -1,54 +1,99 @@
-# ./AI/AI_funcs_gemini.py
 import logging
-
-import google.generativeai as genai
+import threading
+from typing import Iterator, Optional
 
 from APIs import GEMINI_API
-from AI.prompts import prompt
-
-
-# Create a function to generate responses using Chat GPT API
-def generate_response(artists_output: str, weekend_input: str):
-    full_prompt = prompt
-    full_prompt += f"\nYou have to create a lineup for {weekend_input}.\n The Tomorrowland Festival Lineup for {str(weekend_input)} is:\n" + artists_output
-    try:
-        genai.configure(api_key=GEMINI_API)
-
-        # Set up the model
-        generation_config = {
-            "temperature": 1,
-            "top_p": 0.95,
-            "top_k": 0,
-            "max_output_tokens": 8192,
-        }
-
-        safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-        ]
+from AI.llm_client import LLMProvider
+
+GEMINI_MODEL_NAME = "gemini-1.5-pro-latest"
+
+# Set up the model
+generation_config = {
+    "temperature": 1,
+    "top_p": 0.95,
+    "top_k": 0,
+    "max_output_tokens": 8192,
+}
+
+safety_settings = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+]
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str = GEMINI_API, model_name: str = GEMINI_MODEL_NAME):
+        """
+        Gemini client, configured once and shared by all the requests. The SDK is imported and the model
+        created on the first request, to keep the bot's startup fast.
+
+        Args:
+            api_key (str): The Gemini API key.
+            model_name (str): The Gemini model.
+        """
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is not None:
+            return self._model
+        with self._model_lock:
+            if self._model is None:
+                import google.generativeai as genai
 
-        model = genai.GenerativeModel(model_name="gemini-1.5-pro-latest",
-                                      # generation_config=generation_config,
-                                      safety_settings=safety_settings)
-        prompt_parts = [
-            "input:" + full_prompt + " ",
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(model_name=self.model_name,
+                                                    # generation_config=generation_config,
+                                                    safety_settings=safety_settings)
+            return self._model
+
+    def generate(self, prompt: str) -> str:
+        logging.info("waiting for gemini response......")
+        return self.model.generate_content(self._prompt_parts(prompt)).text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        logging.info("waiting for gemini response......")
+        for chunk in self.model.generate_content(self._prompt_parts(prompt), stream=True):
+            if chunk.parts:
+                yield chunk.text
+
+    @staticmethod
+    def _prompt_parts(prompt: str) -> list[str]:
+        return [
+            "input:" + prompt + " ",
             "output: "
         ]
-        logging.info("waiting for gemini response......")
-        return model.generate_content(prompt_parts).text
-    except Exception as e:
-        return str(e)
+
+
+_provider: Optional[GeminiProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> GeminiProvider:
+    """
+    Get the shared Gemini provider, created on first use.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = GeminiProvider()
+        return _provider
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator, Optional
+
+from app.models.artist_model import Artist
+from app.utils.artist_matching import normalize_artist_name
+from app.utils.cache_utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes, so lineups generated with the previous prompt are not served from the cache
+PROMPT_VERSION = 3
+AI_RESPONSE_CACHE_SIZE = 1000
+AI_RESPONSE_TTL_SECONDS = 6 * 60 * 60
+
+
+class LLMProvider(ABC):
+    """
+    A long-lived client of a language model backend.
+
+    Subclasses create their SDK client once, on first use, and reuse it for every request. They must implement
+    'generate', e.g. a stub returning a fixed text in tests:
+
+        class StubProvider(LLMProvider):
+            name = "stub"
+
+            def generate(self, prompt: str) -> str:
+                return "Personalized Lineup for Tomorrowland Festival: ..."
+    """
+    name = "provider"
+
+    @abstractmethod
+    def generate(self, prompt: str) -> str:
+        """
+        Generate the response to a prompt.
+
+        Args:
+            prompt (str): The full prompt.
+
+        Returns:
+            str: The response text.
+
+        Raises:
+            Exception: When the backend fails. Errors are never returned as the response.
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate the response to a prompt, chunk by chunk as the backend produces it.
+        Providers without a streaming API yield the whole response at once.
+
+        Args:
+            prompt (str): The full prompt.
+
+        Yields:
+            str: The next part of the response text.
+        """
+        yield self.generate(prompt)
+
+
+def lineup_cache_key(artists: Iterable[Artist], weekend: str, prompt_version: int = PROMPT_VERSION,
+                     lineup_version: int = 0) -> str:
+    """
+    Build the cache key of an AI lineup: a hash of the normalized artist names with their songs numbers,
+    the weekend, the prompt version and the lineup version. The order and spelling of the playlist artists
+    do not matter. A new lineup snapshot, e.g. moved show times, gives new keys, so no lineup is served
+    with the old times.
+
+    Args:
+        artists (Iterable[Artist]): The artists of the lineup.
+        weekend (str): The selected weekend.
+        prompt_version (int): The version of the prompt.
+        lineup_version (int): The version of the lineup snapshot the artists' shows come from.
+
+    Returns:
+        str: The cache key.
+    """
+    artist_songs = sorted((normalize_artist_name(artist.name), artist.songs_num) for artist in artists)
+    payload = json.dumps([artist_songs, weekend.lower(), prompt_version, lineup_version], ensure_ascii=False,
+                         separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LineupAI:
+    def __init__(self, provider: LLMProvider, build_prompt: Callable[[list[Artist], str], str],
+                 cache_size: int = AI_RESPONSE_CACHE_SIZE, ttl_seconds: float = AI_RESPONSE_TTL_SECONDS,
+                 prompt_version: int = PROMPT_VERSION, get_lineup_version: Optional[Callable[[], int]] = None):
+        """
+        Generate AI lineups with a shared provider, and cache them.
+
+        Identical requests, e.g. a user that starts again and sends the same playlist, get the cached lineup
+        without calling the provider. Failed requests are not cached.
+
+        Args:
+            provider (LLMProvider): The language model provider.
+            build_prompt (Callable[[list[Artist], str], str]): Builds the prompt from the artists and the weekend.
+            cache_size (int): The maximal number of cached lineups.
+            ttl_seconds (float): How long a lineup is served from the cache.
+            prompt_version (int): The version of the prompt, part of the cache key.
+            get_lineup_version (Optional[Callable[[], int]]): Gets the current lineup snapshot version, part of
+                the cache key.
+        """
+        self.provider = provider
+        self.build_prompt = build_prompt
+        self.prompt_version = prompt_version
+        self.get_lineup_version = get_lineup_version
+        self.cache = LRUCache(max_size=cache_size, ttl_seconds=ttl_seconds)
+
+    def cache_key(self, artists: Iterable[Artist], weekend: str) -> str:
+        lineup_version = self.get_lineup_version() if self.get_lineup_version is not None else 0
+        return lineup_cache_key(artists, weekend, self.prompt_version, lineup_version)
+
+    def generate_lineup(self, artists: list[Artist], weekend: str) -> str:
+        """
+        Get the AI lineup of the given artists, from the cache or from the provider.
+
+        Args:
+            artists (list[Artist]): The user's artists of the selected weekend, with their songs numbers.
+            weekend (str): The selected weekend.
+
+        Returns:
+            str: The lineup text.
+        """
+        key = self.cache_key(artists, weekend)
+        lineup = self.get_cached_lineup(key)
+        if lineup is not None:
+            return lineup
+
+        lineup = self.provider.generate(self.build_prompt(artists, weekend))
+        self.cache.set(key, lineup)
+        return lineup
+
+    def get_cached_lineup(self, key: str) -> Optional[str]:
+        lineup = self.cache.get(key)
+        if lineup is not None:
+            logger.info(f"AI lineup served from the cache, {self.cache.stats()}")
+        return lineup
+
+    def stream_lineup(self, artists: list[Artist], weekend: str) -> Iterator[str]:
+        """
+        Stream the AI lineup of the given artists. A cached lineup is yielded at once, and a streamed one is
+        cached when it is complete.
+
+        Args:
+            artists (list[Artist]): The user's artists of the selected weekend, with their songs numbers.
+            weekend (str): The selected weekend.
+
+        Yields:
+            str: The next part of the lineup text.
+        """
+        key = self.cache_key(artists, weekend)
+        lineup = self.get_cached_lineup(key)
+        if lineup is not None:
+            yield lineup
+            return
+        yield from self.stream_prompt(key, self.build_prompt(artists, weekend))
+
+    def stream_prompt(self, key: str, prompt: str) -> Iterator[str]:
+        """
+        Stream the lineup of an already built prompt from the provider, and cache it when it is complete.
+
+        Args:
+            key (str): The cache key of the lineup, from 'cache_key'.
+            prompt (str): The prompt, from 'build_prompt'.
+
+        Yields:
+            str: The next part of the lineup text.
+        """
+        chunks = []
+        for chunk in self.provider.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(key, "".join(chunks))
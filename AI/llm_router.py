@@ -0,0 +1,356 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+from AI.llm_client import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = 60.0
+# A second provider is asked when the first one is slower than this percentile of its recent latencies
+HEDGE_PERCENTILE = 0.95
+MIN_HEDGE_SAMPLES = 20
+LATENCY_SAMPLES = 200
+FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_SECONDS = 30.0
+
+
+class ProviderUnavailableError(Exception):
+    """
+    Raised when no provider could answer a request.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        """
+        Stop sending requests to a failing provider for a while.
+
+        After 'failure_threshold' consecutive failures the circuit opens and requests are refused. After
+        'reset_seconds' a single trial request is let through: its success closes the circuit, its failure
+        opens it again.
+
+        Args:
+            failure_threshold (int): The consecutive failures that open the circuit.
+            reset_seconds (float): How long the circuit stays open.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ProviderMetrics:
+    def __init__(self, latency_samples: int = LATENCY_SAMPLES):
+        """
+        Counters and recent latencies of a provider.
+        """
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.hedges = 0
+        self._latencies: deque[float] = deque(maxlen=latency_samples)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of the recent successful latencies, or None if there are none.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def snapshot(self) -> dict[str, float]:
+        p50, p95 = self.latency_percentile(0.5), self.latency_percentile(0.95)
+        with self._lock:
+            return {"requests": self.requests, "successes": self.successes, "failures": self.failures,
+                    "timeouts": self.timeouts, "rejected": self.rejected, "hedges": self.hedges,
+                    "p50_seconds": round(p50, 3) if p50 is not None else 0.0,
+                    "p95_seconds": round(p95, 3) if p95 is not None else 0.0}
+
+
+class _Attempt:
+    def __init__(self):
+        """
+        A call to a provider, which the router may abandon when it misses its deadline. Only the first of
+        finishing and abandoning counts, so an abandoned call does not update the metrics when it ends.
+        """
+        self._state = "running"
+        self._lock = threading.Lock()
+
+    @property
+    def abandoned(self) -> bool:
+        with self._lock:
+            return self._state == "abandoned"
+
+    def finish(self) -> bool:
+        return self._end("finished")
+
+    def abandon(self) -> bool:
+        return self._end("abandoned")
+
+    def _end(self, state: str) -> bool:
+        with self._lock:
+            if self._state != "running":
+                return False
+            self._state = state
+            return True
+
+
+class ProviderRouter(LLMProvider):
+    name = "router"
+
+    def __init__(self, providers: list[LLMProvider], deadlines: Optional[dict[str, float]] = None,
+                 default_deadline: float = DEFAULT_DEADLINE_SECONDS,
+                 hedge_percentile: Optional[float] = HEDGE_PERCENTILE, min_hedge_samples: int = MIN_HEDGE_SAMPLES,
+                 failure_threshold: int = FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS,
+                 max_workers: int = 8):
+        """
+        Send requests to the first available provider, and fall back to the next ones.
+
+        Each provider has a deadline and a circuit breaker. A provider that fails or misses its deadline is
+        replaced by the next one. When the first provider is slower than its 'hedge_percentile' latency, the
+        request is also sent to the next provider and the first answer wins. Counters and latencies are kept
+        per provider.
+
+        Args:
+            providers (list[LLMProvider]): The providers, by preference.
+            deadlines (Optional[dict[str, float]]): The deadline in seconds per provider name.
+            default_deadline (float): The deadline of providers not in 'deadlines'.
+            hedge_percentile (Optional[float]): The latency percentile that triggers a hedged request, or None
+                to never hedge.
+            min_hedge_samples (int): The latencies a provider needs before its requests are hedged.
+            failure_threshold (int): The consecutive failures that open the circuit of a provider.
+            reset_seconds (float): How long the circuit of a provider stays open.
+            max_workers (int): The maximal number of provider calls running at once.
+        """
+        self.providers = providers
+        self.deadlines = deadlines or {}
+        self.default_deadline = default_deadline
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.breakers = {provider.name: CircuitBreaker(failure_threshold, reset_seconds) for provider in providers}
+        self.metrics = {provider.name: ProviderMetrics() for provider in providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate the response to a prompt with the first provider that answers in time.
+
+        Raises:
+            ProviderUnavailableError: When every provider failed, missed its deadline or has an open circuit.
+        """
+        candidates = iter(self.providers)
+        pending: dict[Future, tuple[LLMProvider, float, _Attempt]] = {}
+        errors: list[str] = []
+
+        def launch_next() -> Optional[LLMProvider]:
+            for provider in candidates:
+                if not self.breakers[provider.name].allow_request():
+                    self.metrics[provider.name].record("rejected")
+                    errors.append(f"{provider.name}: circuit open")
+                    continue
+                attempt = _Attempt()
+                future = self._executor.submit(self._call, provider, prompt, attempt)
+                pending[future] = (provider, time.monotonic() + self._deadline(provider), attempt)
+                return provider
+            return None
+
+        primary = launch_next()
+        primary_future = next(iter(pending), None)
+        hedge_at = self._hedge_time(primary) if primary is not None else None
+        while pending:
+            wake_at = min(deadline for _, deadline, _ in pending.values())
+            if hedge_at is not None:
+                wake_at = min(wake_at, hedge_at)
+            done, _ = wait(list(pending), timeout=max(0.0, wake_at - time.monotonic()), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider, _, _ = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {str(e)}")
+                    if not pending:
+                        launch_next()
+
+            now = time.monotonic()
+            for future, (provider, deadline, attempt) in list(pending.items()):
+                # A call that ends right at its deadline is not abandoned, its result is read on the next wait
+                if deadline <= now and attempt.abandon():
+                    del pending[future]
+                    self.metrics[provider.name].record("timeouts")
+                    self.breakers[provider.name].record_failure()
+                    errors.append(f"{provider.name}: no answer within the deadline")
+                    logger.warning(f"LLM provider {provider.name} missed its deadline")
+                    if not pending:
+                        launch_next()
+
+            if primary_future not in pending:
+                # Only the first provider is hedged, a fallback already is the second try
+                hedge_at = None
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                hedge = launch_next() if pending else None
+                if hedge is not None:
+                    self.metrics[primary.name].record("hedges")
+                    logger.info(f"LLM provider {primary.name} is slow, hedging with {hedge.name}")
+
+        raise ProviderUnavailableError("; ".join(errors) or "No LLM provider configured")
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream the response to a prompt from the first available provider. If a provider fails or misses its
+        deadline before its first chunk, the next one is used. Streams are not hedged.
+
+        Raises:
+            ProviderUnavailableError: When no provider could start answering.
+        """
+        errors: list[str] = []
+        for provider in self.providers:
+            breaker, metrics = self.breakers[provider.name], self.metrics[provider.name]
+            if not breaker.allow_request():
+                metrics.record("rejected")
+                errors.append(f"{provider.name}: circuit open")
+                continue
+            metrics.record("requests")
+            started = time.monotonic()
+            deadline = started + self._deadline(provider)
+            attempt = _Attempt()
+            chunks = self._start_stream(provider, prompt, attempt)
+            started_answering = False
+            try:
+                while True:
+                    try:
+                        # The deadline applies until the first chunk, a started answer is read to its end
+                        chunk, error = chunks.get(timeout=None if started_answering
+                                                  else max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        attempt.abandon()
+                        metrics.record("timeouts")
+                        breaker.record_failure()
+                        errors.append(f"{provider.name}: no answer within the deadline")
+                        logger.warning(f"LLM provider {provider.name} missed its deadline, trying the next one")
+                        break
+                    if error is not None:
+                        raise error
+                    if chunk is None:
+                        metrics.record("successes", time.monotonic() - started)
+                        breaker.record_success()
+                        return
+                    started_answering = True
+                    yield chunk
+            except Exception as e:
+                metrics.record("failures")
+                breaker.record_failure()
+                if started_answering:
+                    raise
+                errors.append(f"{provider.name}: {str(e)}")
+                logger.warning(f"LLM provider {provider.name} failed, trying the next one: {str(e)}")
+            finally:
+                # Stops the stream when it timed out or the caller stopped reading
+                attempt.abandon()
+        raise ProviderUnavailableError("; ".join(errors) or "No LLM provider configured")
+
+    @staticmethod
+    def _start_stream(provider: LLMProvider, prompt: str, attempt: _Attempt) -> queue.Queue:
+        """
+        Read a provider's stream on its own thread, so the router can stop waiting for it.
+
+        Returns:
+            queue.Queue: Receives (chunk, None) for each chunk, then (None, None) at the end or (None, error).
+        """
+        chunks: queue.Queue = queue.Queue()
+
+        def read() -> None:
+            try:
+                for chunk in provider.stream(prompt):
+                    if attempt.abandoned:
+                        return
+                    chunks.put((chunk, None))
+            except Exception as e:
+                chunks.put((None, e))
+                return
+            chunks.put((None, None))
+
+        threading.Thread(target=read, name=f"llm-stream-{provider.name}", daemon=True).start()
+        return chunks
+
+    def _hedge_time(self, provider: LLMProvider) -> Optional[float]:
+        metrics = self.metrics[provider.name]
+        if self.hedge_percentile is None or len(self.providers) < 2 or metrics.samples < self.min_hedge_samples:
+            return None
+        return time.monotonic() + metrics.latency_percentile(self.hedge_percentile)
+
+    def _deadline(self, provider: LLMProvider) -> float:
+        return self.deadlines.get(provider.name, self.default_deadline)
+
+    def _call(self, provider: LLMProvider, prompt: str, attempt: _Attempt) -> str:
+        metrics, breaker = self.metrics[provider.name], self.breakers[provider.name]
+        metrics.record("requests")
+        started = time.monotonic()
+        try:
+            response = provider.generate(prompt)
+        except Exception as e:
+            # A call abandoned at its deadline was already counted as a timeout
+            if attempt.finish():
+                metrics.record("failures")
+                breaker.record_failure()
+                logger.warning(f"LLM provider {provider.name} failed: {str(e)}")
+            raise
+        if attempt.finish():
+            metrics.record("successes", time.monotonic() - started)
+            breaker.record_success()
+        return response
+
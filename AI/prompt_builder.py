@@ -0,0 +1,87 @@
+import logging
+from typing import Iterable
+
+from app.models.artist_model import Artist
+from app.utils.schedule_planner import DayPlan, plan_lineup
+from app.utils.stage_distances import StageDistances
+
+logger = logging.getLogger(__name__)
+
+# Rough number of characters per token of the Gemini and Claude tokenizers, for English text and tables
+CHARACTERS_PER_TOKEN = 4
+
+# The schedule is chosen by the local planner, which gets the overlaps and the walking times right. The model only
+# writes it up, so it must not change the shows or recompute the times
+COMPACT_INSTRUCTIONS = """Write up this personalized Tomorrowland lineup for {weekend}.
+The plan below is final: keep exactly its shows, days, times, walks and free minutes, do not add, drop or move
+shows, and do not recompute any time.
+Free minutes are after the walk. Free >= 90: suggest a proper meal. Free 60-89: suggest a snack. Else no break.
+Output: plain text, no Markdown, chronological, grouped by day, in this format, with a short friendly sentence
+per day about its highlights:
+Personalized Lineup for Tomorrowland Festival:
+Day 1:
+Artist (N songs): Stage, dd/mm, HH:MM to HH:MM
+Travel Time: X minutes to Next Stage
+Suggestion: You have exactly N free minutes before the next act after the walk. This is a great time for a proper meal.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text, without calling the provider.
+    """
+    return -(-len(text) // CHARACTERS_PER_TOKEN)
+
+
+def get_weekend_names(artists: Iterable[Artist], weekend: str) -> list[str]:
+    """
+    Get the weekends to plan for a weekend selection, e.g. ["weekend 1", "weekend 2"] for "both".
+    """
+    if weekend.lower() != "both":
+        return [weekend.lower()]
+    return sorted({show.weekend_number.lower() for artist in artists for show in artist.get_shows()})
+
+
+def encode_plan(day_plans: Iterable[DayPlan]) -> str:
+    """
+    Encode a lineup plan as a terse table, one show per line: day|name|songs|stage|date|start|end|walk|free.
+    'walk' and 'free' are the walking minutes to the next show of the day and the free minutes left after it,
+    empty for the last show of a day.
+
+    Args:
+        day_plans (Iterable[DayPlan]): The plan, from 'plan_lineup'.
+
+    Returns:
+        str: The table.
+    """
+    lines = ["day|name|songs|stage|date|start|end|walk|free"]
+    for day_plan in day_plans:
+        day = f"{day_plan.weekend.title()} {day_plan.day}"
+        for position, planned in enumerate(day_plan.shows):
+            start, end = planned.show.start_datetime, planned.show.end_datetime
+            walk, free = ((planned.travel_minutes, planned.free_minutes) if position < len(day_plan.shows) - 1
+                          else ("", ""))
+            lines.append(f"{day}|{planned.artist.name}|{planned.artist.songs_num}|{planned.show.host_name_and_stage}|"
+                         f"{start:%d/%m}|{start:%H:%M}|{end:%H:%M}|{walk}|{free}")
+    return "\n".join(lines)
+
+
+def build_compact_prompt(artists: list[Artist], weekend: str, stage_distances: StageDistances) -> str:
+    """
+    Build the lineup prompt: the schedule is planned locally, and the model is only asked to write it up.
+    No HTML, links or repeated labels are sent.
+
+    Args:
+        artists (list[Artist]): The user's artists of the selected weekend, with their songs numbers.
+        weekend (str): The selected weekend, or "both".
+        stage_distances (StageDistances): The walking times between the stages.
+
+    Returns:
+        str: The prompt.
+    """
+    weekend_name = "both weekends" if weekend.lower() == "both" else weekend
+    day_plans = plan_lineup(artists, get_weekend_names(artists, weekend), stage_distances.travel_time)
+    prompt = (f"{COMPACT_INSTRUCTIONS.format(weekend=weekend_name)}\n"
+              f"Plan:\n{encode_plan(day_plans)}\n")
+    logger.info(f"Lineup prompt for {len(artists)} artists: ~{estimate_tokens(prompt)} tokens")
+    return prompt
@@ -1,19 +1,220 @@
+import copy
 import logging
+from array import array
+from typing import Callable, List, Optional
+
+from app.models.artist_model import Artist
+from app.models.playlist_model import Playlist, get_playlist_id
 
 
 class UserSession:
     def __init__(self):
         self.username = ""
-        self.my_relevant = []
+        # Lineup artist name -> the artist with its songs number summed over the session's playlists
+        self.relevant_by_name: dict[str, Artist] = {}
         self.selected_weekend = "none"
-        self.artists_str = ""
         self.artists_by_weekend = []
         self.playlist_links_list = []
 
+    @property
+    def my_relevant(self) -> List[Artist]:
+        return list(self.relevant_by_name.values())
+
+    @my_relevant.setter
+    def my_relevant(self, artists: List[Artist]) -> None:
+        self.relevant_by_name = {artist.name: artist for artist in artists}
+
+    def get_playlist(self, link: str) -> Optional[Playlist]:
+        """
+        Get a playlist of the session by link. Links of the same playlist match even if their share parameters
+        differ, e.g. Spotify's 'si' token.
+
+        Args:
+            link (str): The playlist link.
+
+        Returns:
+            Optional[Playlist]: The playlist with its artist aggregate, or None if it was not added.
+        """
+        playlist_id = get_playlist_id(link)
+        for playlist in self.playlist_links_list:
+            if playlist.playlist_id == playlist_id:
+                return playlist
+        return None
+
+    def add_playlist(self, playlist: Playlist, playlist_artists: List[Artist]) -> List[Artist]:
+        """
+        Add a playlist and merge its lineup artists into the session's artists.
+
+        The playlist keeps the songs number of each of its artists, so it can be removed later. A playlist that
+        was already added is ignored, so its songs are never counted twice.
+
+        Args:
+            playlist (Playlist): The playlist.
+            playlist_artists (List[Artist]): The lineup artists of the playlist, with their songs number in it.
+
+        Returns:
+            List[Artist]: The artists that were not in the session before.
+        """
+        if self.get_playlist(playlist.link) is not None:
+            return []
+        playlist.artist_songs = {artist.name: artist.songs_num for artist in playlist_artists}
+        self.playlist_links_list.append(playlist)
+
+        new_artists = []
+        for playlist_artist in playlist_artists:
+            artist = self.relevant_by_name.get(playlist_artist.name)
+            if artist is None:
+                self.relevant_by_name[playlist_artist.name] = playlist_artist
+                new_artists.append(playlist_artist)
+            else:
+                artist.songs_num += playlist_artist.songs_num
+        return new_artists
+
+    def remove_playlist(self, link: str) -> Optional[Playlist]:
+        """
+        Remove a playlist and subtract its songs from the session's artists. Artists left without songs are
+        removed.
+
+        Args:
+            link (str): The playlist link.
+
+        Returns:
+            Optional[Playlist]: The removed playlist, or None if it was not added.
+        """
+        playlist = self.get_playlist(link)
+        if playlist is None:
+            return None
+        self.playlist_links_list.remove(playlist)
+
+        for name, songs_num in playlist.artist_songs.items():
+            artist = self.relevant_by_name.get(name)
+            if artist is None:
+                continue
+            artist.songs_num -= songs_num
+            if artist.songs_num <= 0:
+                del self.relevant_by_name[name]
+        return playlist
+
     def clear_all(self):
-        self.my_relevant.clear()
+        self.relevant_by_name.clear()
         self.selected_weekend = "none"
-        self.artists_str = ""
         self.artists_by_weekend.clear()
         self.playlist_links_list.clear()
-        logging.info("All data has been cleared")
\ No newline at end of file
+        logging.info("All data has been cleared")
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the session compactly: lineup artists are stored by name with their songs number and Spotify
+        link, and derived data (the weekend filter) is not stored.
+
+        Returns:
+            dict: The JSON-serializable session.
+        """
+        return {
+            "u": self.username,
+            "w": self.selected_weekend,
+            "a": [[artist.name, artist.songs_num] + ([artist.spotify_link] if artist.spotify_link else [])
+                  for artist in self.my_relevant],
+            "p": [[playlist.platform, playlist.link, playlist.artist_songs] for playlist in self.playlist_links_list],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, get_lineup_artist: Callable[[str], Optional[Artist]]) -> "UserSession":
+        """
+        Restore a session serialized by 'to_dict'.
+
+        Args:
+            data (dict): The serialized session.
+            get_lineup_artist (Callable[[str], Optional[Artist]]): Returns a copy of the lineup artist with the
+                given name, or None if it is no longer in the lineup.
+
+        Returns:
+            UserSession: The restored session.
+        """
+        session = cls()
+        session.username = data.get("u", "")
+        session.selected_weekend = data.get("w", "none")
+        for name, songs_num, *spotify_link in data.get("a", []):
+            artist = get_lineup_artist(name)
+            if artist is None:
+                continue
+            artist.songs_num = songs_num
+            if spotify_link:
+                artist.spotify_link = spotify_link[0]
+            session.relevant_by_name[artist.name] = artist
+        # Sessions stored before the playlists kept their artists have no aggregate
+        session.playlist_links_list = [Playlist(platform, link, *artist_songs)
+                                       for platform, link, *artist_songs in data.get("p", [])]
+        return session
+
+    def to_refs(self, get_artist_id: Callable[[str], Optional[int]],
+                get_artist_by_id: Callable[[int], Optional[Artist]]) -> tuple:
+        """
+        Pack the session into arrays of lineup artist IDs and song numbers, for in-process storage.
+
+        Spotify links are only kept for the artists whose link differs from the one of the lineup.
+        Artists that are not in the lineup are dropped. The artists of each playlist are packed the same way.
+
+        Args:
+            get_artist_id (Callable[[str], Optional[int]]): Returns the lineup ID of an artist name.
+            get_artist_by_id (Callable[[int], Optional[Artist]]): Returns the shared lineup artist of an ID.
+
+        Returns:
+            tuple: The packed session.
+        """
+        artist_ids = array('i')
+        songs_nums = array('i')
+        spotify_links = []
+        for artist in self.my_relevant:
+            artist_id = get_artist_id(artist.name)
+            # An artist keeps its ID after a lineup refresh drops it from the snapshot
+            lineup_artist = get_artist_by_id(artist_id) if artist_id is not None else None
+            if lineup_artist is None:
+                continue
+            if artist.spotify_link and artist.spotify_link != lineup_artist.spotify_link:
+                spotify_links.append((len(artist_ids), artist.spotify_link))
+            artist_ids.append(artist_id)
+            songs_nums.append(artist.songs_num)
+        playlists = []
+        for playlist in self.playlist_links_list:
+            playlist_ids, playlist_songs = array('i'), array('i')
+            for name, songs_num in playlist.artist_songs.items():
+                artist_id = get_artist_id(name)
+                if artist_id is not None:
+                    playlist_ids.append(artist_id)
+                    playlist_songs.append(songs_num)
+            playlists.append((playlist.platform, playlist.link, playlist_ids, playlist_songs))
+        return (self.username, self.selected_weekend, artist_ids, songs_nums, tuple(spotify_links),
+                tuple(playlists))
+
+    @classmethod
+    def from_refs(cls, refs: tuple, get_artist_by_id: Callable[[int], Optional[Artist]]) -> "UserSession":
+        """
+        Restore a session packed by 'to_refs'.
+
+        Args:
+            refs (tuple): The packed session.
+            get_artist_by_id (Callable[[int], Optional[Artist]]): Returns the shared lineup artist of an ID.
+
+        Returns:
+            UserSession: The restored session.
+        """
+        session = cls()
+        session.username, session.selected_weekend, artist_ids, songs_nums, spotify_links, playlists = refs
+        spotify_links = dict(spotify_links)
+        for position, (artist_id, songs_num) in enumerate(zip(artist_ids, songs_nums)):
+            lineup_artist = get_artist_by_id(artist_id)
+            if lineup_artist is None:
+                continue
+            artist = copy.copy(lineup_artist)
+            artist.songs_num = songs_num
+            artist.spotify_link = spotify_links.get(position, artist.spotify_link)
+            session.relevant_by_name[artist.name] = artist
+        for platform, link, playlist_ids, playlist_songs in playlists:
+            playlist = Playlist(platform, link)
+            for artist_id, songs_num in zip(playlist_ids, playlist_songs):
+                lineup_artist = get_artist_by_id(artist_id)
+                if lineup_artist is not None:
+                    playlist.artist_songs[lineup_artist.name] = songs_num
+            session.playlist_links_list.append(playlist)
+        return session
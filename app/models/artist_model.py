@@ -3,16 +3,22 @@ from app.models.show_model import Show
 
 
 class Artist:
+    __slots__ = ('name', 'songs_num', 'show', 'show2', 'spotify_link')
+
     def __init__(self, name: str, host_name_and_stage: str, weekend: str, date: str, songs_num: int = 0,
-                 spotify_link: str = ""):
+                 spotify_link: str = "", start: int = 0, end: int = 0, day: str = ""):
         self.name = name
         self.songs_num = songs_num
-        self.show = Show(weekend, host_name_and_stage, date)
+        self.show = Show(weekend, host_name_and_stage, date, start, end, day)
         self.show2: Optional[Show] = None
         self.spotify_link = spotify_link
 
-    def add_new_show(self, weekend: str, host_name_and_stage: str, date: str) -> None:
-        self.show2 = Show(weekend, host_name_and_stage, date)
+    def add_new_show(self, weekend: str, host_name_and_stage: str, date: str, start: int = 0, end: int = 0,
+                     day: str = "") -> None:
+        self.show2 = Show(weekend, host_name_and_stage, date, start, end, day)
+
+    def get_shows(self) -> list[Show]:
+        return [self.show] if self.show2 is None else [self.show, self.show2]
 
     def __str__(self, selected_weekend: str = "") -> str:
         art_with_spotify = f'<a href="{self.spotify_link}">{self.name}</a>' if self.spotify_link else self.name
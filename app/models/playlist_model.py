@@ -1,7 +1,38 @@
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def get_playlist_id(link: str) -> str:
+    """
+    Get the platform's ID of a playlist link, so copies of the same playlist compare equal. Spotify share links
+    get a new 'si' token every time they are copied, and YouTube Music links may carry extra parameters.
+
+    Args:
+        link (str): The playlist link.
+
+    Returns:
+        str: e.g. "spotify:<id>" or "youtube:<list id>", or the link itself if it has no recognizable ID.
+    """
+    parsed = urlparse(link.strip())
+    if parsed.netloc == "open.spotify.com" and parsed.path.startswith("/playlist/"):
+        return f"spotify:{parsed.path[len('/playlist/'):].strip('/')}"
+    if parsed.netloc == "music.youtube.com":
+        list_ids = parse_qs(parsed.query).get("list")
+        if list_ids:
+            return f"youtube:{list_ids[0]}"
+    return link.strip()
+
+
 class Playlist:
-    def __init__(self, platform, link):
+    def __init__(self, platform, link, artist_songs: Optional[dict[str, int]] = None):
         self.platform = platform
         self.link = link
+        # Lineup artist name -> songs number of the artist in this playlist
+        self.artist_songs = artist_songs if artist_songs is not None else {}
+
+    @property
+    def playlist_id(self) -> str:
+        return get_playlist_id(self.link)
 
     def __str__(self):
         return f"*{self.platform}*\nLink: {self.link}"
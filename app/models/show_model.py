@@ -1,8 +1,40 @@
+import sys
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Tomorrowland takes place in Boom, Belgium
+FESTIVAL_TIMEZONE = ZoneInfo("Europe/Brussels")
+
+
 class Show:
-    def __init__(self, weekend_number, host_name_and_stage, date):
-        self.weekend_number = weekend_number
-        self.host_name_and_stage = host_name_and_stage
+    # Shows are shared by every session that matched the artist, so they are kept small
+    __slots__ = ('weekend_number', 'host_name_and_stage', 'date', 'start', 'end', 'day')
+
+    def __init__(self, weekend_number, host_name_and_stage, date, start: int = 0, end: int = 0, day: str = ""):
+        self.weekend_number = sys.intern(weekend_number) if weekend_number else weekend_number
+        self.host_name_and_stage = sys.intern(host_name_and_stage) if host_name_and_stage else host_name_and_stage
         self.date = date
+        # Epoch seconds of the show start and end, 0 when unknown
+        self.start = start
+        self.end = end
+        # The festival day of the show, as given by the lineup. Shows after midnight belong to the previous day
+        self.day = sys.intern(day) if isinstance(day, str) else day
+
+    @property
+    def start_datetime(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.start, FESTIVAL_TIMEZONE) if self.start else None
+
+    @property
+    def end_datetime(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.end, FESTIVAL_TIMEZONE) if self.end else None
+
+    def overlaps(self, other: "Show") -> bool:
+        """
+        Check whether two shows of the same weekend overlap in time.
+        """
+        return (self.weekend_number == other.weekend_number and bool(self.start and other.start)
+                and self.start < other.end and other.start < self.end)
 
     def __str__(self):
         return f"{self.weekend_number}:\n\nStage and host name: {self.host_name_and_stage}\nDate: {self.date}"
@@ -1,17 +1,34 @@
+import argparse
 import logging
-from typing import List, Union, Callable
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Optional, Union, Callable
 import sys
 from pathlib import Path
 import APIs
 import telebot
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from AI import AI_funcs_gemini as Gemini
+from AI import AI_funcs_claude as Claude
+from AI.llm_client import LineupAI
+from AI.llm_router import ProviderRouter
+from AI.prompt_builder import build_compact_prompt, estimate_tokens
 from app.models.artist_model import Artist
-from app.utils.spotify_funcs import SpotifyManager
-from app.utils.spotify_funcs import get_spotify_artist_link
+from app.utils.spotify_funcs import SpotifyManager, SpotifyArtistLinkResolver
+from app.utils.artist_link_cache import ArtistLinkCache
+from app.utils.ai_job_queue import AIJobQueue
+from app.utils.chat_dispatcher import BackendLimiter, ChatDispatcher, dispatch_by_chat
+from app.utils.session_store import create_session_store
+from app.utils.schedule_planner import plan_lineup, format_lineup_plan
+from app.utils.stage_distances import StageDistances
+from app.utils.streaming_message import StreamingMessage
+from app.utils.telegram_sender import TelegramSender
+from app.views.artist_view import ArtistCardCache, pack_messages
+from app.webhook_server import WebhookServer, DEFAULT_WEBHOOK_PATH
 import app.utils.youtube_funcs as youtube_funcs
 import app.utils.public_funcs as public_funcs
-from tomorrowland_lineup_managment.public_funcs import extract_artists_from_tomorrowland_lineup
+from app.utils.artist_matching import LineupIndex, get_lineup_index, DEFAULT_SIMILARITY_THRESHOLD
+from tomorrowland_lineup_managment.public_funcs import lineup_store
 from UserSession import UserSession
 from app.models.playlist_model import Playlist
 
@@ -22,18 +39,88 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize Telegram bot
-bot = telebot.TeleBot(APIs.TELEGRAM_BOT_API)
+# Initialize Telegram bot. Updates are handed to the chat dispatcher, so the polling thread never blocks
+bot = telebot.TeleBot(APIs.TELEGRAM_BOT_API, threaded=False)
+# Everything sent to the chats goes through the sender, which keeps within Telegram's rate limits
+sender = TelegramSender(bot)
 
 # Constants
 WEEKEND_NAMES = ["Weekend 1", "Weekend 2"]
-GIF_URL = "https://media1.giphy.com/media/v1.Y2lkPTc5MGI3NjExNW45bTBnaGRxbmF0a2wxbnJ0ajR6aDV6MHJ6eTltMnphY2xqZmdpeCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/5zoxhCaYbdVHoJkmpf/giphy.gif"
+# Fuzzy matching also finds lineup acts spelled differently in the playlist, e.g. "Dimitri Vegas" or "Amelie Lens"
+FUZZY_MATCHING = False
+SIMILARITY_THRESHOLD = DEFAULT_SIMILARITY_THRESHOLD
+# Handlers of different chats run in parallel on HANDLER_WORKERS threads
+HANDLER_WORKERS = 16
+# Maximal concurrent calls per backend, across all chats
+BACKEND_CONCURRENCY = {"spotify": 8, "youtube": 4, "ai": 4}
+# "memory" keeps sessions in this process, "sqlite" persists them and shares them between processes
+SESSION_BACKEND = "memory"
+# Seconds an AI provider has to answer before the next one is asked
+AI_DEADLINES = {"gemini": 90.0, "claude": 90.0}
+# Tokens the AI lineups can spend per minute, and the tokens expected in a lineup on top of its prompt
+AI_TOKENS_PER_MINUTE = 300_000
+AI_RESPONSE_TOKENS = 2000
+# Replaces the lineup placeholder when the AI answered with an empty lineup
+EMPTY_LINEUP_TEXT = "No lineup could be generated. Please try again later."
+# Playlists of the same message fetched at once
+PLAYLIST_FETCH_CONCURRENCY = 4
+# Check the links of a message with HEAD requests before fetching them, on top of their pattern
+CHECK_LINKS_ONLINE = False
 
 # Initialize SpotifyManager
 spotify_manager = SpotifyManager(APIs.SPOTIFY_CLIENT_ID_API, APIs.SPOTIFY_CLIENT_SECRET_API)
+# The link cache opens its SQLite file and the stage distances parse the walking time table, so both are
+# created on first use instead of at import
+_spotify_link_resolver: Optional[SpotifyArtistLinkResolver] = None
+_stage_distances: Optional[StageDistances] = None
+_lazy_init_lock = threading.Lock()
+
+dispatcher = ChatDispatcher(max_workers=HANDLER_WORKERS)
+backend_limiter = BackendLimiter(BACKEND_CONCURRENCY)
+artist_cards = ArtistCardCache()
+# One client per AI provider for the whole bot, Gemini first and Claude when Gemini fails or is slow.
+# The generated lineups are cached
+ai_router = ProviderRouter([Gemini.get_provider(), Claude.get_provider()], deadlines=AI_DEADLINES)
+lineup_ai = LineupAI(ai_router,
+                     lambda artists, weekend: build_compact_prompt(artists, weekend, get_stage_distances()),
+                     get_lineup_version=lambda: lineup_store.get_snapshot().version)
+# At most BACKEND_CONCURRENCY["ai"] lineups are generated at once, the same lineup only once
+ai_jobs = AIJobQueue(max_concurrent=BACKEND_CONCURRENCY["ai"], tokens_per_minute=AI_TOKENS_PER_MINUTE)
+
+
+def get_spotify_link_resolver() -> SpotifyArtistLinkResolver:
+    """
+    Get the shared Spotify artist link resolver and its link cache, created on first use.
+    """
+    global _spotify_link_resolver
+    with _lazy_init_lock:
+        if _spotify_link_resolver is None:
+            _spotify_link_resolver = SpotifyArtistLinkResolver(spotify_manager, ArtistLinkCache())
+        return _spotify_link_resolver
+
+
+def get_stage_distances() -> StageDistances:
+    """
+    Get the walking times between the stages, parsed on first use.
+    """
+    global _stage_distances
+    with _lazy_init_lock:
+        if _stage_distances is None:
+            _stage_distances = StageDistances()
+        return _stage_distances
+
 
-# Store user sessions
-user_sessions: dict[int, UserSession] = {}
+def get_update_chat_id(update: Union[telebot.types.Message, telebot.types.CallbackQuery]) -> int:
+    """
+    Get the chat ID of a message or of the message of a callback query.
+    """
+    if isinstance(update, telebot.types.CallbackQuery):
+        return update.message.chat.id
+    return update.chat.id
+
+
+# Run the decorated handler on the dispatcher, in order with the other updates of the same chat
+in_chat_worker = dispatch_by_chat(dispatcher, get_update_chat_id)
 
 
 # Keyboard layouts
@@ -55,12 +142,14 @@ def create_weekend_keyboard() -> InlineKeyboardMarkup:
 
 def create_generate_lineup_keyboard() -> InlineKeyboardMarkup:
     """
-    Create a keyboard layout for generating an AI lineup.
+    Create a keyboard layout for generating a lineup.
 
     Returns:
-        InlineKeyboardMarkup: Keyboard layout with options to generate AI Lineup or to indicate completion.
+        InlineKeyboardMarkup: Keyboard layout with options to generate a quick or an AI Lineup, or to indicate
+        completion.
     """
     keyboard = InlineKeyboardMarkup()
+    keyboard.row(InlineKeyboardButton("Quick Lineup", callback_data='generate_quick_lineup'))
     keyboard.row(
         InlineKeyboardButton("Generate AI Lineup", callback_data='generate_ai_lineup'),
         InlineKeyboardButton("No, I'm done", callback_data='done')
@@ -83,37 +172,24 @@ def create_finish_keyboard() -> InlineKeyboardMarkup:
 def typing_action(chat_id: int) -> None:
     """
     Send a 'typing' action to the chat to indicate that the bot is processing.
+    The action is dropped if the chat is already shown as typing.
 
     Args:
         chat_id (int): The ID of the chat where the typing action should be sent.
     """
-    bot.send_chat_action(chat_id=chat_id, action='typing')
+    sender.send_chat_action(chat_id, 'typing')
 
 
-def get_matching_artists(playlist_artists: List[Artist], lineup_data: List[Artist]) -> List[Artist]:
+def get_lineup_index_for_snapshot() -> LineupIndex:
     """
-    Get a list of artists from the playlist that match the lineup data.
-
-    Args:
-        playlist_artists (List[Artist]): List of artists from the playlist.
-        lineup_data (List[Artist]): List of artists from the lineup.
+    Get the matching index of the current lineup snapshot.
 
     Returns:
-        List[Artist]: List of matching artists with updated song numbers.
+        LineupIndex: The index of the current lineup.
     """
-    matching_artists = [
-        lineup_artist for playlist_artist in playlist_artists
-        for lineup_artist in lineup_data
-        if lineup_artist.name.lower() == playlist_artist.name.lower()
-    ]
-
-    for matching_artist in matching_artists:
-        matching_artist.songs_num = next(
-            artist.songs_num for artist in playlist_artists
-            if artist.name.lower() == matching_artist.name.lower()
-        )
-
-    return matching_artists
+    lineup_snapshot = lineup_store.get_snapshot()
+    return get_lineup_index(lineup_snapshot.artists, lineup_snapshot.version,
+                            fuzzy=FUZZY_MATCHING, similarity_threshold=SIMILARITY_THRESHOLD)
 
 
 def get_lineup_artists_from_playlist(playlist: Union[Playlist, str]) -> List[Artist]:
@@ -136,32 +212,38 @@ def get_lineup_artists_from_playlist(playlist: Union[Playlist, str]) -> List[Art
             playlist_link = playlist.link
 
         if "spotify.com" in playlist_link:
-            playlist_artists = spotify_manager.get_artists_from_spotify_playlist(playlist_link)
+            with backend_limiter.limit("spotify"):
+                playlist_artists = spotify_manager.get_artists_from_spotify_playlist(playlist_link)
         else:
-            playlist_artists = youtube_funcs.get_artists_from_youtube_playlist(playlist_link)
+            with backend_limiter.limit("youtube"):
+                playlist_artists = youtube_funcs.get_artists_from_youtube_playlist(playlist_link)
 
-        lineup_data = extract_artists_from_tomorrowland_lineup()
-        return get_matching_artists(playlist_artists, lineup_data)
+        return get_lineup_index_for_snapshot().match(playlist_artists)
     except Exception as e:
         logger.error(f"An error occurred in get_lineup_artists_from_playlist: {str(e)}")
         raise
 
 
-def update_spotify_link(user_session: UserSession) -> None:
+def update_spotify_link(artists: List[Artist]) -> None:
     """
-    Update the Spotify links for artists in the user session.
+    Resolve the missing Spotify links of artists, e.g. the artists a new playlist added to the session.
 
     Args:
-        user_session (UserSession): The current user session.
+        artists (List[Artist]): The artists to update.
     """
-    for artist in user_session.my_relevant:
-        if not artist.spotify_link:
-            artist.spotify_link = get_spotify_artist_link(spotify_manager=spotify_manager, artist_name=artist.name)
+    missing_links = [artist for artist in artists if not artist.spotify_link]
+    if not missing_links:
+        return
+    with backend_limiter.limit("spotify"):
+        links = get_spotify_link_resolver().resolve([artist.name for artist in missing_links])
+    for artist in missing_links:
+        artist.spotify_link = links.get(artist.name, "")
 
 
 def filter_artists_by_weekend(artists: List[Artist], weekend_name: str) -> List[Artist]:
     """
-    Filter artists by the selected weekend.
+    Filter artists by the selected weekend, with the show index of the current lineup snapshot, which is built
+    once per snapshot version.
 
     Args:
         artists (List[Artist]): List of artists.
@@ -170,67 +252,125 @@ def filter_artists_by_weekend(artists: List[Artist], weekend_name: str) -> List[
     Returns:
         List[Artist]: List of artists performing on the selected weekend.
     """
-    return [
-        artist for artist in artists
-        if (artist.show.weekend_number.lower() == weekend_name.lower()) or
-           (artist.show2 is not None and artist.show2.weekend_number.lower() == weekend_name.lower())
-    ]
+    return lineup_store.get_snapshot().show_index.filter_on_weekend(artists, weekend_name)
 
 
-def generate_and_print_ai_lineup(user_session: UserSession, chat_id: int) -> None:
+def generate_and_print_ai_lineup(user_session: UserSession, chat_id: int) -> Future:
     """
     Generate and print an AI lineup for the user.
 
+    The lineup is streamed into a single message, edited as the text arrives, so the user starts reading
+    it as soon as the AI starts answering. Until then the message shows the position in the AI job queue.
+    This does not wait for the lineup, so the chat worker is free for other updates meanwhile. Whatever is sent
+    once the lineup is done has to be queued on the chat's dispatcher queue, like the final edit of the lineup.
+
     Args:
         user_session (UserSession): The current user session.
         chat_id (int): The ID of the chat where the AI lineup should be printed.
+
+    Returns:
+        Future: Resolves to the lineup text when it has been printed.
     """
     try:
         typing_action(chat_id)
-        bot.send_message(chat_id=chat_id, text="Your lineup is in process, please wait a while.. ",
-                         parse_mode='Markdown')
-        bot.send_animation(chat_id=chat_id, animation=GIF_URL)
-        typing_action(chat_id)
-        response = Gemini.generate_response(user_session.artists_str, user_session.selected_weekend)
-        logger.info(f"Username is: {user_session.username}, AI response: {str(response)}")
-        typing_action(chat_id)
-        bot.send_message(chat_id=chat_id, text=str(response))
+        message = StreamingMessage(sender, chat_id, "Your lineup is in process, please wait a while..")
+        weekend = user_session.selected_weekend
+        artists = get_selected_artists(user_session)
+        key = lineup_ai.cache_key(artists, weekend)
+        lineup = lineup_ai.get_cached_lineup(key)
+        if lineup is not None:
+            message.append(lineup)
+            message.finish(EMPTY_LINEUP_TEXT)
+            future = Future()
+            future.set_result(lineup)
+            return future
+        prompt = lineup_ai.build_prompt(artists, weekend)
     except Exception as e:
         logger.error(f"Username is: {user_session.username}, Error generating and printing AI lineup: {str(e)}")
+        sender.send_message(chat_id=chat_id,
+                            text="An error occurred while generating the AI lineup. Please try again later.")
+        future = Future()
+        future.set_exception(e)
+        return future
+
+    def run(emit: Callable[[str], None]) -> None:
+        for chunk in lineup_ai.stream_prompt(key, prompt):
+            emit(chunk)
+
+    def show_position(position: int) -> None:
+        message.set_status(f"Your lineup is number {position} in the queue, please wait a while..")
+
+    def deliver(job: Future) -> None:
+        try:
+            response = job.result()
+            message.finish(EMPTY_LINEUP_TEXT)
+            logger.info(f"Username is: {user_session.username}, AI response: {response}")
+        except Exception as e:
+            logger.error(f"Username is: {user_session.username}, Error generating and printing AI lineup: {str(e)}")
+            sender.send_message(chat_id=chat_id,
+                                text="An error occurred while generating the AI lineup. Please try again later.")
+
+    future = ai_jobs.submit(key, run, estimate_tokens(prompt) + AI_RESPONSE_TOKENS,
+                            on_chunk=message.append, on_position=show_position)
+    # The job ends on an AI worker thread, the result is delivered in order with the other updates of the chat
+    future.add_done_callback(lambda job: dispatcher.submit(chat_id, deliver, job))
+    return future
+
+
+def generate_and_print_quick_lineup(user_session: UserSession, chat_id: int) -> None:
+    """
+    Plan the lineup locally, maximizing the known songs with the walking times between the stages, and print it.
+
+    Args:
+        user_session (UserSession): The current user session.
+        chat_id (int): The ID of the chat where the lineup should be printed.
+    """
+    try:
+        weekend_names = ([weekend.lower() for weekend in WEEKEND_NAMES] if user_session.selected_weekend == 'both'
+                         else [user_session.selected_weekend.lower()])
+        day_plans = plan_lineup(user_session.my_relevant, weekend_names, get_stage_distances().travel_time)
         typing_action(chat_id)
-        bot.send_message(chat_id=chat_id,
-                         text="An error occurred while generating the AI lineup. Please try again later.")
+        # One message per day, so a plan of both weekends stays under the Telegram message length limit
+        for day_text in format_lineup_plan(day_plans).split("\n\n"):
+            sender.send_message(chat_id=chat_id, text=day_text)
+    except Exception as e:
+        logger.error(f"Username is: {user_session.username}, Error generating and printing quick lineup: {str(e)}")
+        sender.send_message(chat_id=chat_id,
+                            text="An error occurred while generating the lineup. Please try again later.")
+
+
+def get_selected_artists(user_session: UserSession) -> List[Artist]:
+    """
+    Get the user's artists of the selected weekend.
+    """
+    return user_session.my_relevant if user_session.selected_weekend == 'both' else user_session.artists_by_weekend
+
+
+def render_artist_cards(user_session: UserSession) -> List[str]:
+    """
+    Render the cards of the user's artists of the selected weekend, from the shared card cache.
+    """
+    lineup_version = lineup_store.get_snapshot().version
+    return [artist_cards.render(artist, user_session.selected_weekend, lineup_version)
+            for artist in get_selected_artists(user_session)]
 
 
 def message_artists_to_user(chat_id: int, user_session: UserSession) -> None:
     """
-    Send a message to the user with the list of artists.
+    Send a message to the user with the list of artists, in as few messages as the length limit allows.
 
     Args:
         chat_id (int): The ID of the chat where the artists should be messaged.
         user_session (UserSession): The current user session.
     """
     try:
-        if len(user_session.artists_by_weekend) == 0:
-            # It means that the user chose 'both' weekends
-            artists_chunks = [user_session.my_relevant[i:i + 12] for i in range(0, len(user_session.my_relevant), 12)]
-        else:
-            artists_chunks = [user_session.artists_by_weekend[i:i + 12] for i in
-                              range(0, len(user_session.artists_by_weekend), 12)]
+        cards = render_artist_cards(user_session)
         typing_action(chat_id)
-        for chunk in artists_chunks:
-            chunk_str = "\n\n--------------------------------\n\n".join(
-                str(artist.__str__(user_session.selected_weekend)) for artist in chunk)
-            bot.send_message(chat_id, chunk_str, parse_mode='HTML', disable_web_page_preview=True)
-
-        user_session.artists_str = ", ".join(
-            str(art.__str__(user_session.selected_weekend))
-            for art in
-            (user_session.my_relevant if user_session.selected_weekend == 'both' else user_session.artists_by_weekend)
-        )
+        for message_text in pack_messages(cards):
+            sender.send_message(chat_id, message_text, parse_mode='HTML', disable_web_page_preview=True)
     except Exception as e:
         logger.error(f"Username is: {user_session.username}, Error messaging artists to user: {str(e)}")
-        bot.send_message(chat_id, "An error occurred while processing the artist list. Please try again later.")
+        sender.send_message(chat_id, "An error occurred while processing the artist list. Please try again later.")
 
 
 def process_weekend_data(chat_id: int, user_session: UserSession) -> None:
@@ -246,57 +386,68 @@ def process_weekend_data(chat_id: int, user_session: UserSession) -> None:
     typing_action(chat_id)
     list_len = len(
         user_session.artists_by_weekend if user_session.selected_weekend != 'both' else user_session.my_relevant)
-    bot.send_message(chat_id,
-                     f"*{user_session.selected_weekend} artists:*\n"
-                     f"*{list_len}* artists that have been found in {user_session.selected_weekend}:",
-                     parse_mode='Markdown')
+    sender.send_message(chat_id,
+                        f"*{user_session.selected_weekend} artists:*\n"
+                        f"*{list_len}* artists that have been found in {user_session.selected_weekend}:",
+                        parse_mode='Markdown')
 
     message_artists_to_user(chat_id, user_session)
 
 
-def add_artists_from_new_playlist(current_artists: List[Artist], new_artists: List[Artist]) -> List[Artist]:
+def get_or_create_session(chat_id: int) -> UserSession:
     """
-    Add new artists from a new playlist to the current list of artists.
+    Get or create a user session for the given chat ID.
+    The session is a copy loaded from the session store, so changes must be saved with 'save_session'.
 
     Args:
-        current_artists (List[Artist]): List of current artists.
-        new_artists (List[Artist]): List of new artists.
+        chat_id (int): The ID of the chat.
 
     Returns:
-        List[Artist]: Updated list of artists with new artists added.
+        UserSession: The existing or newly created user session.
     """
-    artist_dict = {artist.name: artist for artist in current_artists}
+    user_session = session_store.get(chat_id)
+    if user_session is None:
+        return UserSession()
+    if user_session.selected_weekend != "none":
+        user_session.artists_by_weekend = filter_artists_by_weekend(user_session.my_relevant,
+                                                                    user_session.selected_weekend.lower())
+    return user_session
 
-    for new_artist in new_artists:
-        if new_artist.name in artist_dict:
-            artist_dict[new_artist.name].songs_num += new_artist.songs_num
-        else:
-            artist_dict[new_artist.name] = new_artist
 
-    return list(artist_dict.values())
+def save_session(chat_id: int, user_session: UserSession) -> None:
+    """
+    Store the changes of a user session. Sessions are loaded as copies, so every change has to be saved.
 
+    Args:
+        chat_id (int): The ID of the chat.
+        user_session (UserSession): The changed user session.
+    """
+    session_store.save(chat_id, user_session)
 
-def get_or_create_session(chat_id: int) -> UserSession:
+
+def clear_session(chat_id: int, user_session: UserSession) -> None:
     """
-    Get or create a user session for the given chat ID.
+    Clear a user session and remove it from the store.
 
     Args:
         chat_id (int): The ID of the chat.
-
-    Returns:
-        UserSession: The existing or newly created user session.
+        user_session (UserSession): The user session.
     """
-    if chat_id not in user_sessions:
-        user_sessions[chat_id] = UserSession()
-    return user_sessions[chat_id]
+    user_session.clear_all()
+    session_store.delete(chat_id)
+
+
+session_store = create_session_store(SESSION_BACKEND, lambda name: get_lineup_index_for_snapshot().get_artist(name),
+                                     lineup_store.get_snapshot)
 
 
 # Message handlers
 @bot.message_handler(commands=["start"])
+@in_chat_worker
 def start(message: telebot.types.Message) -> None:
     chat_id = message.chat.id
     user_session = get_or_create_session(chat_id)
-    user_session.clear_all()
+    clear_session(chat_id, user_session)
     first_message = (
         "Hello! I am the Telegram bot.\nTo get started, send a playlist link:\n"
         "Notes:\n"
@@ -304,128 +455,249 @@ def start(message: telebot.types.Message) -> None:
         "(as mentioned <a href='https://community.spotify.com/t5/Your-Library/Create-a-Playlist-from-Liked-Songs/td-p/4998474'>here</a>)."
     )
     typing_action(chat_id)
-    bot.send_message(chat_id, first_message, parse_mode='HTML', disable_web_page_preview=True)
+    sender.send_message(chat_id, first_message, parse_mode='HTML', disable_web_page_preview=True)
     logger.info(f'Username is: {user_session.username}, wrote:\n{str(message.text)}')
 
 
-@bot.message_handler(func=lambda message: not message.text.startswith(
-    "https://open.spotify.com/playlist/") and not message.text.startswith("https://music.youtube.com"))
+@bot.message_handler(commands=["remove"])
+@in_chat_worker
+def handle_remove_playlist(message: telebot.types.Message) -> None:
+    chat_id = message.chat.id
+    user_session = get_or_create_session(chat_id)
+    link = message.text.partition(" ")[2].strip()
+    typing_action(chat_id)
+    if user_session.remove_playlist(link) is None:
+        sender.send_message(chat_id, "Send /remove followed by the link of a playlist you have added.")
+        return
+    save_session(chat_id, user_session)
+    sender.send_message(chat_id,
+                        f"The playlist has been removed. {len(user_session.relevant_by_name)} relevant artists are "
+                        f"left in your {len(user_session.playlist_links_list)} playlists.",
+                        reply_markup=create_weekend_keyboard() if user_session.relevant_by_name else None)
+
+
+@bot.message_handler(func=lambda message: not public_funcs.contains_playlist_link(message.text))
+@in_chat_worker
 def handle_invalid_link(message: telebot.types.Message) -> None:
     typing_action(message.chat.id)
-    bot.send_message(message.chat.id, "Please send a valid Spotify or YouTube music link!")
-
+    sender.send_message(message.chat.id, "Please send a valid Spotify or YouTube music link!")
 
-def handle_music_link(message: telebot.types.Message, platform_name: str) -> None:
-    chat_id = message.chat.id
-    user_session = get_or_create_session(chat_id)
 
-    try:
-        bot.send_message(chat_id,
-                         "Great! Please wait a moment while I process the playlist...")
-        typing_action(chat_id)
-        curr_playlist = Playlist(platform=platform_name, link=message.text)
-        typing_action(chat_id)
-        if curr_playlist.platform == "Unknown":
-            bot.send_message(chat_id, "Invalid link!", parse_mode='Markdown')
-            logger.warning(f'Username is: {user_session.username} Invalid {platform_name} link received')
-            return
-        if curr_playlist.link not in [playlist.link for playlist in user_session.playlist_links_list]:
-            user_session.playlist_links_list.append(curr_playlist)
+def send_playlist_summary(chat_id: int, user_session: UserSession) -> None:
+    """
+    Tell the user how many relevant artists their playlists have, and offer the weekends.
 
-        new_artists = get_lineup_artists_from_playlist(curr_playlist)
-        user_session.my_relevant = add_artists_from_new_playlist(user_session.my_relevant, new_artists)
+    Args:
+        chat_id (int): The ID of the chat.
+        user_session (UserSession): The current user session.
+    """
+    typing_action(chat_id)
+    if not user_session.relevant_by_name:
+        sender.send_message(chat_id,
+                            "No matching artists found in the playlist. Please try a different playlist link.")
+        return
+    playlists_num = len(user_session.playlist_links_list)
+    total = (f"Playlist contains {len(user_session.relevant_by_name)} relevant artists" if playlists_num == 1
+             else f"Your {playlists_num} playlists contain {len(user_session.relevant_by_name)} relevant artists")
+    sender.send_message(chat_id,
+                        f"{total}. "
+                        f"If you want to add a new playlist, just send it now. "
+                        f"If not - please select your weekend:",
+                        reply_markup=create_weekend_keyboard())
+
+
+def add_playlists(chat_id: int, user_session: UserSession, links: List[str]) -> None:
+    """
+    Fetch the playlists of a message concurrently and merge each one into the session as soon as it is fetched.
 
-        typing_action(chat_id)
+    At most PLAYLIST_FETCH_CONCURRENCY playlists of the message are fetched at once, on top of the per-backend
+    limits. A single progress message is edited in place while the playlists complete. Playlists that were
+    already added are answered from their stored artists, without fetching them again.
 
-        if len(user_session.my_relevant) == 0:
-            bot.send_message(chat_id,
-                             "No matching artists found in the playlist. Please try a different playlist link.")
+    Args:
+        chat_id (int): The ID of the chat.
+        user_session (UserSession): The current user session.
+        links (List[str]): The playlist links of the message.
+    """
+    progress = StreamingMessage(sender, chat_id, "Great! Please wait a moment while I process the "
+                                                 f"{'playlist' if len(links) == 1 else f'{len(links)} playlists'}...")
+    results = {}
+    new_playlists = []
+    for link in links:
+        added_playlist = user_session.get_playlist(link)
+        if added_playlist is not None:
+            results[link] = f"already added, {len(added_playlist.artist_songs)} relevant artists"
         else:
-            update_spotify_link(user_session)
-            typing_action(chat_id)
-            bot.send_message(chat_id,
-                             f"Playlist contains {len(user_session.my_relevant)} relevant artists. "
-                             f"If you want to add a new playlist, just send it now. "
-                             f"If not - please select your weekend:",
-                             reply_markup=create_weekend_keyboard())
-    except Exception as e:
-        logger.error(f"Username is: {user_session.username}, Error in handle_music_link: {str(e)}")
-        bot.send_message(chat_id, "An error occurred while processing the playlist. Please try again later.")
-
-
-@bot.message_handler(func=lambda message: message.text.startswith("https://open.spotify.com/playlist/"))
-def handle_spotify_link(message: telebot.types.Message) -> None:
-    handle_music_link(message, "Spotify")
+            new_playlists.append(Playlist(platform=public_funcs.get_link_platform(link), link=link))
 
+    new_artists = []
+    if new_playlists:
+        typing_action(chat_id)
+        with ThreadPoolExecutor(max_workers=min(PLAYLIST_FETCH_CONCURRENCY, len(new_playlists))) as executor:
+            futures = {executor.submit(get_lineup_artists_from_playlist, playlist): playlist
+                       for playlist in new_playlists}
+            for done, future in enumerate(as_completed(futures), start=1):
+                playlist = futures[future]
+                try:
+                    new_artists += user_session.add_playlist(playlist, future.result())
+                    results[playlist.link] = f"{len(playlist.artist_songs)} relevant artists"
+                except Exception as e:
+                    logger.error(f"Username is: {user_session.username}, Error adding playlist {playlist.link}: "
+                                 f"{str(e)}")
+                    results[playlist.link] = "could not be processed, please try again later"
+                progress.set_status(f"Processed {done} of {len(new_playlists)} playlists, "
+                                    f"{len(user_session.relevant_by_name)} relevant artists so far...")
+        # Only the artists the new playlists add to the session need their Spotify links
+        update_spotify_link(new_artists)
+        save_session(chat_id, user_session)
+
+    progress.append("\n".join(f"{link}\n{results[link]}" for link in links))
+    progress.finish()
+
+
+@bot.message_handler(func=lambda message: public_funcs.contains_playlist_link(message.text))
+@in_chat_worker
+def handle_playlist_links(message: telebot.types.Message) -> None:
+    chat_id = message.chat.id
+    user_session = get_or_create_session(chat_id)
 
-@bot.message_handler(func=lambda message: message.text.startswith("https://music.youtube.com"))
-def handle_youtube_link(message: telebot.types.Message) -> None:
-    handle_music_link(message, "YouTube")
+    try:
+        links = public_funcs.split_links(message.text, check_online=CHECK_LINKS_ONLINE)
+        if not links:
+            sender.send_message(chat_id, "Invalid link!")
+            logger.warning(f'Username is: {user_session.username} Invalid playlist link received')
+            return
+        add_playlists(chat_id, user_session, links)
+        send_playlist_summary(chat_id, user_session)
+    except Exception as e:
+        logger.error(f"Username is: {user_session.username}, Error in handle_playlist_links: {str(e)}")
+        sender.send_message(chat_id, "An error occurred while processing the playlist. Please try again later.")
 
 
 @bot.callback_query_handler(func=lambda call: call.data in WEEKEND_NAMES)
+@in_chat_worker
 def handle_weekend_selection(call: telebot.types.CallbackQuery) -> None:
     chat_id = call.message.chat.id
     user_session = get_or_create_session(chat_id)
     user_session.selected_weekend = call.data
     bot.answer_callback_query(call.id)
     process_weekend_data(chat_id, user_session)
+    save_session(chat_id, user_session)
     typing_action(chat_id)
-    bot.send_message(chat_id, "Would you like to generate an AI lineup?",
-                     reply_markup=create_generate_lineup_keyboard())
+    sender.send_message(chat_id, "Would you like to generate an AI lineup?",
+                        reply_markup=create_generate_lineup_keyboard())
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'weekend_all')
+@in_chat_worker
 def handle_all_weekends(call: telebot.types.CallbackQuery) -> None:
     chat_id = call.message.chat.id
     user_session = get_or_create_session(chat_id)
     bot.answer_callback_query(call.id)
     user_session.selected_weekend = 'both'
     process_weekend_data(chat_id, user_session)
+    save_session(chat_id, user_session)
     typing_action(chat_id)
-    bot.send_message(chat_id, "Would you like to generate an AI lineup?",
-                     reply_markup=create_generate_lineup_keyboard())
+    sender.send_message(chat_id, "Would you like to generate an AI lineup?",
+                        reply_markup=create_generate_lineup_keyboard())
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'generate_ai_lineup')
+@in_chat_worker
 def handle_generate_ai_lineup(call: telebot.types.CallbackQuery) -> None:
     chat_id = call.message.chat.id
     user_session = get_or_create_session(chat_id)
     bot.answer_callback_query(call.id)
-    generate_and_print_ai_lineup(user_session, chat_id)
+    generate_and_print_ai_lineup(user_session, chat_id).add_done_callback(
+        lambda _: dispatcher.submit(chat_id, sender.send_message, chat_id, "Would you like to start over?",
+                                    reply_markup=create_finish_keyboard()))
+
+
+@bot.callback_query_handler(func=lambda call: call.data == 'generate_quick_lineup')
+@in_chat_worker
+def handle_generate_quick_lineup(call: telebot.types.CallbackQuery) -> None:
+    chat_id = call.message.chat.id
+    user_session = get_or_create_session(chat_id)
+    bot.answer_callback_query(call.id)
+    generate_and_print_quick_lineup(user_session, chat_id)
     typing_action(chat_id)
-    bot.send_message(chat_id, "Would you like to start over?",
-                     reply_markup=create_finish_keyboard())
+    sender.send_message(chat_id, "Would you like an AI lineup as well?",
+                        reply_markup=create_generate_lineup_keyboard())
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'done')
+@in_chat_worker
 def handle_done(call: telebot.types.CallbackQuery) -> None:
     chat_id = call.message.chat.id
     user_session = get_or_create_session(chat_id)
-    user_session.clear_all()
+    clear_session(chat_id, user_session)
     bot.answer_callback_query(call.id)
     typing_action(chat_id)
-    bot.send_message(chat_id, "Thank you for using the bot!")
+    sender.send_message(chat_id, "Thank you for using the bot!")
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'start_again')
+@in_chat_worker
 def handle_start_again(call: telebot.types.CallbackQuery) -> None:
     chat_id = call.message.chat.id
     user_session = get_or_create_session(chat_id)
-    user_session.clear_all()
+    clear_session(chat_id, user_session)
     typing_action(chat_id)
-    bot.send_message(chat_id, "Starting over! Please send a playlist link to get started:")
+    sender.send_message(chat_id, "Starting over! Please send a playlist link to get started:")
     logger.info(f'Username is: {user_session.username}, clicked start again')
 
 
 # Error handler
 @bot.message_handler(func=lambda message: True)
+@in_chat_worker
 def fallback_handler(message: telebot.types.Message) -> None:
     chat_id = message.chat.id
     typing_action(chat_id)
-    bot.send_message(chat_id, "Unrecognized command. Please send a valid Spotify or YouTube music link.")
+    sender.send_message(chat_id, "Unrecognized command. Please send a valid Spotify or YouTube music link.")
+
+
+def process_update_json(update_json: dict) -> None:
+    """
+    Route a raw Telegram update to the bot handlers.
+
+    Args:
+        update_json (dict): The update as posted by Telegram.
+    """
+    bot.process_new_updates([telebot.types.Update.de_json(update_json)])
+
+
+def run_webhook(host: str, port: int, webhook_url: Optional[str], secret_token: str) -> None:
+    """
+    Receive updates through a webhook instead of long polling.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        webhook_url (Optional[str]): The public URL Telegram should post to. When not given, the webhook is not
+            registered with Telegram, e.g. when it is shared by replicas or when testing locally.
+        secret_token (str): The secret token Telegram sends with every update.
+    """
+    if webhook_url:
+        bot.remove_webhook()
+        bot.set_webhook(url=webhook_url, secret_token=secret_token)
+    WebhookServer(process_update_json, secret_token, host=host, port=port, path=DEFAULT_WEBHOOK_PATH).serve_forever()
 
 
 # Start the bot
 if __name__ == "__main__":
-    bot.polling(none_stop=True)
+    parser = argparse.ArgumentParser(description="LineUp vs Spotify Telegram bot")
+    parser.add_argument("--webhook", action="store_true", help="Receive updates through a webhook server")
+    parser.add_argument("--host", default="0.0.0.0", help="Webhook server address")
+    parser.add_argument("--port", type=int, default=8080, help="Webhook server port")
+    parser.add_argument("--webhook-url", help="Public URL to register with Telegram, ending with "
+                                              f"{DEFAULT_WEBHOOK_PATH}")
+    parser.add_argument("--secret-token", default=getattr(APIs, "TELEGRAM_WEBHOOK_SECRET", ""),
+                        help="Webhook secret token (defaults to APIs.TELEGRAM_WEBHOOK_SECRET)")
+    args = parser.parse_args()
+
+    if args.webhook:
+        if not args.secret_token:
+            parser.error("--webhook needs a secret token")
+        run_webhook(args.host, args.port, args.webhook_url, args.secret_token)
+    else:
+        bot.polling(none_stop=True)
@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called with the next chunk of a job's output
+ChunkListener = Callable[[str], None]
+# Called with the position of a waiting job in the queue, 1 for the next job to run
+PositionListener = Callable[[int], None]
+
+
+class TokenBudget:
+    def __init__(self, tokens_per_minute: int):
+        """
+        Token bucket that spreads the AI requests over time, so the provider's tokens-per-minute limit is not hit.
+
+        Args:
+            tokens_per_minute (int): The tokens that can be spent per minute. The bucket holds one minute of tokens.
+        """
+        self.capacity = tokens_per_minute
+        self._tokens = float(tokens_per_minute)
+        self._refill_per_second = tokens_per_minute / 60
+        self._updated_at = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Wait until the tokens are available and spend them. Requests larger than the whole budget wait for a full
+        bucket.
+
+        Args:
+            tokens (int): The estimated tokens of the request.
+        """
+        tokens = min(tokens, self.capacity)
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._refill_per_second)
+                self._updated_at = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                self._condition.wait((tokens - self._tokens) / self._refill_per_second)
+
+
+class _Job:
+    def __init__(self, key: Hashable, run: Callable[[ChunkListener], None], tokens: int):
+        self.key = key
+        self.run = run
+        self.tokens = tokens
+        self.future: Future = Future()
+        self.chunks: list[str] = []
+        self.chunk_listeners: list[ChunkListener] = []
+        self.position_listeners: list[PositionListener] = []
+        self.lock = threading.Lock()
+
+    def emit(self, chunk: str) -> None:
+        with self.lock:
+            self.chunks.append(chunk)
+            listeners = list(self.chunk_listeners)
+        for listener in listeners:
+            _notify(listener, chunk)
+
+    def subscribe(self, on_chunk: Optional[ChunkListener], on_position: Optional[PositionListener]) -> None:
+        with self.lock:
+            # A request that joins a running job first gets what the others already received
+            chunks = list(self.chunks)
+            if on_chunk is not None:
+                self.chunk_listeners.append(on_chunk)
+            if on_position is not None:
+                self.position_listeners.append(on_position)
+        if on_chunk is not None and chunks:
+            _notify(on_chunk, "".join(chunks))
+
+
+def _notify(listener: Callable, value) -> None:
+    try:
+        listener(value)
+    except Exception as e:
+        logger.warning(f"Error notifying an AI job listener: {str(e)}")
+
+
+class AIJobQueue:
+    def __init__(self, max_concurrent: int = 4, tokens_per_minute: int = 1_000_000):
+        """
+        Bounded queue of AI jobs, in front of the providers.
+
+        At most 'max_concurrent' jobs run at once, and a job starts only when the token budget allows it. Jobs
+        with the same key, e.g. the cache key of a lineup, are run once: the requests that arrive while the job
+        is queued or running share its output and result. Waiting requests are told their queue position.
+
+        Args:
+            max_concurrent (int): The maximal number of jobs running at once.
+            tokens_per_minute (int): The tokens the jobs can spend per minute.
+        """
+        self.budget = TokenBudget(tokens_per_minute)
+        self._waiting: deque[_Job] = deque()
+        self._jobs: dict[Hashable, _Job] = {}
+        self._condition = threading.Condition()
+        self._workers = [threading.Thread(target=self._work, name=f"ai-job-{position}", daemon=True)
+                         for position in range(max_concurrent)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key: Hashable, run: Callable[[ChunkListener], None], tokens: int,
+               on_chunk: Optional[ChunkListener] = None, on_position: Optional[PositionListener] = None) -> Future:
+        """
+        Queue a job, or join the queued or running job with the same key.
+
+        Args:
+            key (Hashable): The key of the job. Jobs with the same key produce the same output.
+            run (Callable[[ChunkListener], None]): The job. It passes its output, chunk by chunk, to its argument.
+            tokens (int): The estimated tokens the job spends.
+            on_chunk (Optional[ChunkListener]): Called with the output of the job as it is produced.
+            on_position (Optional[PositionListener]): Called with the queue position while the job is waiting.
+
+        Returns:
+            Future: Resolves to the whole output of the job.
+        """
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = _Job(key, run, tokens)
+                self._waiting.append(job)
+                self._condition.notify()
+                position: Optional[int] = len(self._waiting)
+            else:
+                logger.info(f"AI job {key} is already queued or running, sharing its result")
+                position = self._waiting.index(job) + 1 if job in self._waiting else None
+            job.subscribe(on_chunk, on_position)
+        if on_position is not None and position is not None:
+            _notify(on_position, position)
+        return job.future
+
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._waiting)
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._waiting:
+                    self._condition.wait()
+                job = self._waiting.popleft()
+                waiting = list(self._waiting)
+            self._notify_positions(waiting)
+
+            try:
+                self.budget.acquire(job.tokens)
+                job.run(job.emit)
+            except Exception as e:
+                logger.error(f"Error running AI job {job.key}: {str(e)}")
+                with self._condition:
+                    del self._jobs[job.key]
+                job.future.set_exception(e)
+                continue
+            with self._condition:
+                del self._jobs[job.key]
+            job.future.set_result("".join(job.chunks))
+
+    @staticmethod
+    def _notify_positions(waiting: list[_Job]) -> None:
+        for position, job in enumerate(waiting, start=1):
+            with job.lock:
+                listeners = list(job.position_listeners)
+            for listener in listeners:
+                _notify(listener, position)
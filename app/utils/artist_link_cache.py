@@ -0,0 +1,83 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.utils.artist_matching import normalize_artist_name
+from app.utils.cache_utils import LRUCache
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[2] / "artist_links.sqlite3"
+LINK_TTL_SECONDS = 30 * 24 * 60 * 60
+NEGATIVE_LINK_TTL_SECONDS = 24 * 60 * 60
+
+
+class ArtistLinkCache:
+    def __init__(self, db_path: Optional[Path] = DEFAULT_DB_PATH, max_size: int = 5000):
+        """
+        Artist name -> Spotify link cache shared by all users.
+
+        Links are kept in an in-memory LRU cache backed by a SQLite file, so a lineup act is resolved at most
+        once across users and restarts.
+
+        Args:
+            db_path (Optional[Path]): The SQLite file, or None to keep the cache in memory only.
+            max_size (int): The maximal number of links kept in memory.
+        """
+        self._memory = LRUCache(max_size=max_size)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path is not None:
+            try:
+                self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS artist_links (name TEXT PRIMARY KEY, link TEXT, expires_at REAL)")
+                self._db.execute("DELETE FROM artist_links WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error opening the artist link cache {db_path}: {str(e)}")
+                self._db = None
+
+    def get(self, artist_name: str) -> Optional[str]:
+        """
+        Get the cached link of an artist.
+
+        Args:
+            artist_name (str): The name of the artist.
+
+        Returns:
+            Optional[str]: The cached link, or None if the artist is not cached.
+        """
+        key = normalize_artist_name(artist_name)
+        link = self._memory.get(key)
+        if link is not None or self._db is None:
+            return link
+
+        with self._db_lock:
+            row = self._db.execute("SELECT link, expires_at FROM artist_links WHERE name = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        self._memory.set(key, row[0], ttl_seconds=row[1] - time.time())
+        return row[0]
+
+    def set(self, artist_name: str, link: str, ttl_seconds: float = LINK_TTL_SECONDS) -> None:
+        """
+        Cache the link of an artist.
+
+        Args:
+            artist_name (str): The name of the artist.
+            link (str): The Spotify link, or the "not found" result.
+            ttl_seconds (float): How long the link is valid.
+        """
+        key = normalize_artist_name(artist_name)
+        self._memory.set(key, link, ttl_seconds=ttl_seconds)
+        if self._db is None:
+            return
+        with self._db_lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO artist_links VALUES (?, ?, ?)",
+                                 (key, link, time.time() + ttl_seconds))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error saving the link of {artist_name}: {str(e)}")
@@ -0,0 +1,249 @@
+import copy
+import re
+import threading
+import unicodedata
+from typing import List, Optional
+
+from app.models.artist_model import Artist
+
+# Separators between collaborating artists, e.g. "Dimitri Vegas & Like Mike", "Armin van Buuren x Vini Vici",
+# "Adam Beyer b2b Cirez D"
+COLLABORATOR_SEPARATOR_PATTERN = re.compile(r"\s+(?:&|and|x|b2b|vs\.?)\s+|\s*,\s*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Known alternative names of lineup acts, both sides normalized: alias -> lineup name
+ARTIST_ALIASES = {
+    "dvlm": "dimitri vegas & like mike",
+    "dimitri vegas and like mike": "dimitri vegas & like mike",
+    "shm": "swedish house mafia",
+    "afrojack & david guetta": "david guetta & afrojack",
+    "axwell & ingrosso": "axwell /\\ ingrosso",
+}
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.75
+
+
+def normalize_artist_name(name: str) -> str:
+    """
+    Normalize an artist name for matching: strip accents, casefold and collapse whitespace.
+
+    Args:
+        name (str): The artist name.
+
+    Returns:
+        str: The normalized artist name.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return WHITESPACE_PATTERN.sub(" ", without_accents.casefold()).strip()
+
+
+def split_collaborators(normalized_name: str) -> List[str]:
+    """
+    Split a normalized artist name into its collaborating artists.
+
+    Args:
+        normalized_name (str): A name returned by 'normalize_artist_name'.
+
+    Returns:
+        List[str]: The names of the collaborators, or an empty list if the name is a single artist.
+    """
+    parts = [part for part in COLLABORATOR_SEPARATOR_PATTERN.split(normalized_name) if part]
+    return parts if len(parts) > 1 else []
+
+
+def name_trigrams(normalized_name: str) -> set[str]:
+    """
+    Get the character trigrams of a normalized name, padded so the first and last letters count too.
+
+    Args:
+        normalized_name (str): A name returned by 'normalize_artist_name'.
+
+    Returns:
+        set[str]: The trigrams of the name.
+    """
+    padded = f"  {normalized_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, names: List[str]):
+        """
+        Inverted index from character trigrams to names, for fuzzy name lookups.
+
+        Args:
+            names (List[str]): The normalized names to index.
+        """
+        self.names = names
+        self._trigram_counts = []
+        self._postings: dict[str, List[int]] = {}
+        for name_id, name in enumerate(names):
+            trigrams = name_trigrams(name)
+            self._trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self._postings.setdefault(trigram, []).append(name_id)
+
+    def best_match(self, normalized_name: str, threshold: float) -> Optional[str]:
+        """
+        Find the indexed name most similar to the given name.
+
+        Similarity is the Dice coefficient of the trigram sets. Only names sharing at least one trigram with
+        the query are scored.
+
+        Args:
+            normalized_name (str): A name returned by 'normalize_artist_name'.
+            threshold (float): The minimal similarity, between 0 and 1.
+
+        Returns:
+            Optional[str]: The most similar indexed name, or None if none reaches the threshold.
+        """
+        query_trigrams = name_trigrams(normalized_name)
+        query_count = len(query_trigrams)
+        shared_counts: dict[int, int] = {}
+        for trigram in query_trigrams:
+            for name_id in self._postings.get(trigram, ()):
+                shared_counts[name_id] = shared_counts.get(name_id, 0) + 1
+
+        best_name, best_score = None, threshold
+        for name_id, shared_count in shared_counts.items():
+            score = 2 * shared_count / (query_count + self._trigram_counts[name_id])
+            if score >= best_score:
+                best_name, best_score = self.names[name_id], score
+        return best_name
+
+
+class LineupIndex:
+    def __init__(self, lineup_artists: List[Artist], version: int = 0, fuzzy: bool = False,
+                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD, aliases: dict[str, str] = None):
+        """
+        Hash index of the lineup artists by normalized name.
+
+        Each lineup act is indexed by its full normalized name and, for collaborations, by the name of each
+        collaborator, so matching a playlist is a single pass of dictionary lookups. In fuzzy mode, names
+        without an exact match are looked up in a trigram index of the same names.
+
+        Args:
+            lineup_artists (List[Artist]): The lineup artists. They are never mutated by the index.
+            version (int): The version of the lineup snapshot the index was built from.
+            fuzzy (bool): Whether to fall back to fuzzy matching when there is no exact match.
+            similarity_threshold (float): The minimal trigram similarity of a fuzzy match, between 0 and 1.
+            aliases (dict[str, str]): Alternative names of lineup acts. Defaults to 'ARTIST_ALIASES'.
+        """
+        self.artists = lineup_artists
+        self.version = version
+        self.fuzzy = fuzzy
+        self.similarity_threshold = similarity_threshold
+        self._by_name: dict[str, int] = {}
+        self._by_collaborator: dict[str, List[int]] = {}
+
+        for position, artist in enumerate(lineup_artists):
+            normalized_name = normalize_artist_name(artist.name)
+            self._by_name.setdefault(normalized_name, position)
+            for collaborator in split_collaborators(normalized_name):
+                self._by_collaborator.setdefault(collaborator, []).append(position)
+
+        self._aliases = {
+            normalize_artist_name(alias): normalize_artist_name(name)
+            for alias, name in (aliases if aliases is not None else ARTIST_ALIASES).items()
+        }
+        self._trigram_index = TrigramIndex(list(self._by_name) + list(self._by_collaborator)) if fuzzy else None
+
+    def lookup(self, artist_name: str) -> List[int]:
+        """
+        Find the positions of the lineup acts that match an artist name.
+
+        An exact match of the full name or of one of its aliases wins. Otherwise the name and each of its
+        collaborators are looked up as lineup acts and as collaborators of lineup acts, first exactly and then,
+        in fuzzy mode, by trigram similarity.
+
+        Args:
+            artist_name (str): The artist name, e.g. from a playlist.
+
+        Returns:
+            List[int]: The positions of the matching acts in 'self.artists'.
+        """
+        normalized_name = normalize_artist_name(artist_name)
+        position = self._by_name.get(self._aliases.get(normalized_name, normalized_name))
+        if position is not None:
+            return [position]
+
+        names = [normalized_name] + split_collaborators(normalized_name)
+        positions = self._lookup_names(names)
+        if positions or self._trigram_index is None:
+            return positions
+
+        fuzzy_names = [self._trigram_index.best_match(name, self.similarity_threshold) for name in names]
+        return self._lookup_names([name for name in fuzzy_names if name is not None])
+
+    def _lookup_names(self, names: List[str]) -> List[int]:
+        positions: List[int] = []
+        for name in names:
+            position = self._by_name.get(self._aliases.get(name, name))
+            if position is not None and position not in positions:
+                positions.append(position)
+            for position in self._by_collaborator.get(name, []):
+                if position not in positions:
+                    positions.append(position)
+        return positions
+
+    def get_artist(self, artist_name: str) -> Optional[Artist]:
+        """
+        Get a lineup artist by exact (normalized) name.
+
+        Args:
+            artist_name (str): The name of the lineup artist.
+
+        Returns:
+            Optional[Artist]: A copy of the lineup artist, or None if it is not in the lineup.
+        """
+        position = self._by_name.get(normalize_artist_name(artist_name))
+        return copy.copy(self.artists[position]) if position is not None else None
+
+    def match(self, playlist_artists: List[Artist]) -> List[Artist]:
+        """
+        Get the lineup artists that appear in a playlist.
+
+        Args:
+            playlist_artists (List[Artist]): List of artists from the playlist.
+
+        Returns:
+            List[Artist]: Copies of the matching lineup artists, with the songs number summed over all the
+            playlist artists that matched them.
+        """
+        songs_by_position: dict[int, int] = {}
+        for playlist_artist in playlist_artists:
+            for position in self.lookup(playlist_artist.name):
+                songs_by_position[position] = songs_by_position.get(position, 0) + playlist_artist.songs_num
+
+        matching_artists = []
+        for position, songs_num in songs_by_position.items():
+            matching_artist = copy.copy(self.artists[position])
+            matching_artist.songs_num = songs_num
+            matching_artists.append(matching_artist)
+        return matching_artists
+
+
+_index_lock = threading.Lock()
+_cached_index: Optional[LineupIndex] = None
+
+
+def get_lineup_index(lineup_artists: List[Artist], version: int, fuzzy: bool = False,
+                     similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> LineupIndex:
+    """
+    Get the index of a lineup snapshot, building it only once per snapshot version and matching mode.
+
+    Args:
+        lineup_artists (List[Artist]): The lineup artists of the snapshot.
+        version (int): The version of the snapshot.
+        fuzzy (bool): Whether the index falls back to fuzzy matching.
+        similarity_threshold (float): The minimal trigram similarity of a fuzzy match.
+
+    Returns:
+        LineupIndex: The index of the snapshot.
+    """
+    global _cached_index
+    with _index_lock:
+        if (_cached_index is None or _cached_index.version != version or _cached_index.fuzzy != fuzzy
+                or _cached_index.similarity_threshold != similarity_threshold):
+            _cached_index = LineupIndex(lineup_artists, version, fuzzy, similarity_threshold)
+        return _cached_index
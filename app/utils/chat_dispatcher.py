@@ -0,0 +1,124 @@
+import functools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ChatDispatcher:
+    def __init__(self, max_workers: int = 16):
+        """
+        Run handlers on a bounded worker pool, in order within each chat.
+
+        Every chat has its own queue, and at most one of its jobs runs at a time, so the messages of a user
+        are handled in the order they were sent while different chats are handled in parallel. After each
+        job the chat goes back to the end of the pool queue, so a busy chat cannot starve the others.
+
+        Args:
+            max_workers (int): The maximal number of handlers running at once.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-worker")
+        self._queues: dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, chat_id: Hashable, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a job for a chat.
+
+        Args:
+            chat_id (Hashable): The chat the job belongs to.
+            func (Callable): The job.
+            *args: Positional arguments of the job.
+            **kwargs: Keyword arguments of the job.
+
+        Returns:
+            Future: The result of the job.
+        """
+        future = Future()
+        with self._lock:
+            queue = self._queues.get(chat_id)
+            idle = queue is None
+            if idle:
+                queue = self._queues[chat_id] = deque()
+            queue.append((future, func, args, kwargs))
+        if idle:
+            self._executor.submit(self._run_next, chat_id)
+        return future
+
+    def _run_next(self, chat_id: Hashable) -> None:
+        with self._lock:
+            future, func, args, kwargs = self._queues[chat_id].popleft()
+
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except Exception as e:
+                    logger.exception(f"Unhandled error in a handler of chat {chat_id}: {str(e)}")
+                    future.set_exception(e)
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+        finally:
+            # Even after e.g. a SystemExit in a handler, the chat must not stay busy forever
+            self._schedule_next(chat_id)
+
+    def _schedule_next(self, chat_id: Hashable) -> None:
+        with self._lock:
+            if not self._queues[chat_id]:
+                del self._queues[chat_id]
+                return
+        self._executor.submit(self._run_next, chat_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class BackendLimiter:
+    def __init__(self, limits: dict[str, int]):
+        """
+        Limit the number of concurrent calls to each backend (Spotify, YouTube, the AI providers...).
+
+        Args:
+            limits (dict[str, int]): The maximal number of concurrent calls per backend name.
+        """
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+
+    @contextmanager
+    def limit(self, backend: str) -> Iterator[None]:
+        """
+        Wait until a call to the backend is allowed, and hold the slot for the duration of the block.
+        Backends without a configured limit are not limited.
+
+        Args:
+            backend (str): The backend name.
+        """
+        semaphore = self._semaphores.get(backend)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+def dispatch_by_chat(dispatcher: ChatDispatcher, get_chat_id: Callable[[Any], Hashable]) -> Callable:
+    """
+    Decorator that runs a bot handler on the dispatcher instead of the thread that received the update.
+
+    Args:
+        dispatcher (ChatDispatcher): The dispatcher.
+        get_chat_id (Callable[[Any], Hashable]): Gets the chat ID from the handler's first argument.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(update, *args, **kwargs) -> Future:
+            return dispatcher.submit(get_chat_id(update), handler, update, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,11 +1,62 @@
 # ./playlists_managment/public_funcs.py
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+from app.models.playlist_model import get_playlist_id
+
+SPOTIFY_PLAYLIST_PATTERN = re.compile(r"https://open\.spotify\.com/playlist/[A-Za-z0-9]+(?:\?[^\s<>]*)?")
+YOUTUBE_PLAYLIST_PATTERN = re.compile(r"https://music\.youtube\.com/[^\s<>]+")
+PLAYLIST_LINK_PATTERN = re.compile(f"{SPOTIFY_PLAYLIST_PATTERN.pattern}|{YOUTUBE_PLAYLIST_PATTERN.pattern}")
+LINK_CHECK_TIMEOUT_SECONDS = 5
+LINK_CHECK_WORKERS = 8
+
+
+def normalize_playlist_link(link: str) -> str:
+    """
+    Drop the share parameters of a Spotify playlist link, e.g. its 'si' token, which changes on every copy.
+    YouTube Music links are kept as they are, since their playlist is a parameter.
+
+    Args:
+        link (str): The playlist link.
+
+    Returns:
+        str: The link without its share parameters.
+    """
+    if SPOTIFY_PLAYLIST_PATTERN.fullmatch(link):
+        return link.split("?", 1)[0]
+    return link
+
+
+def get_link_platform(link: str) -> str:
+    """
+    Get the platform of a playlist link.
+
+    Args:
+        link (str): The playlist link.
+
+    Returns:
+        str: "Spotify", "YouTube" or "Unknown".
+    """
+    if SPOTIFY_PLAYLIST_PATTERN.fullmatch(link):
+        return "Spotify"
+    if YOUTUBE_PLAYLIST_PATTERN.fullmatch(link):
+        return "YouTube"
+    return "Unknown"
 
-def is_link_valid(link):
+
+def contains_playlist_link(text: str) -> bool:
+    """
+    Check if a message contains at least one Spotify or YouTube Music playlist link.
+    """
+    return bool(text) and PLAYLIST_LINK_PATTERN.search(text) is not None
+
+
+def is_link_valid(link: str, timeout: float = LINK_CHECK_TIMEOUT_SECONDS) -> bool:
     """
-    This function checks if a link is valid.
+    This function checks if a link is valid, with a HEAD request so the page itself is not downloaded.
 
     Returns:
       `True` if the link is valid, `False` if not.
@@ -15,25 +66,36 @@ def is_link_valid(link):
     if not link:
         return False
     try:
-        response = requests.get(link)
+        response = requests.head(link, allow_redirects=True, timeout=timeout)
         # Check if the request was successful.
-        return response.status_code == 200
-    except requests.exceptions.HTTPError:
-        # The link is not valid.
+        return response.status_code < 400
+    except requests.exceptions.RequestException:
+        # The link is not reachable.
         return False
 
 
-def split_links(links: str) -> list[str]:
+def split_links(links: str, check_online: bool = False, max_workers: int = LINK_CHECK_WORKERS) -> list[str]:
     """
-    Splits a string of links into a list of individual links.
+    Find the playlist links in a message, e.g. one link per line.
+
+    Links are recognized by their pattern, in the order they appear. Links of the same playlist, e.g. Spotify
+    links with different 'si' tokens, are kept once. When 'check_online' is set, they are also checked with
+    concurrent HEAD requests and the unreachable ones are dropped.
 
     Args:
-        links (str): A string containing one or more links separated by newline characters.
+        links (str): A string containing one or more links.
+        check_online (bool): Whether to check that the links can be reached.
+        max_workers (int): The maximal number of concurrent checks.
 
     Returns:
         list[str]: A list of individual links.
     """
-    links_list = links.split("\n")  # Split by newline characters
-    valid_links = [link.strip() for link in links_list if
-                   is_link_valid(link)]  # Filter valid links and remove leading/trailing spaces
-    return valid_links
+    links_by_id: dict[str, str] = {}
+    for link in PLAYLIST_LINK_PATTERN.findall(links or ""):
+        links_by_id.setdefault(get_playlist_id(link), normalize_playlist_link(link))
+    found_links = list(links_by_id.values())
+    if not check_online or not found_links:
+        return found_links
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(found_links))) as executor:
+        valid = list(executor.map(is_link_valid, found_links))
+    return [link for link, is_valid in zip(found_links, valid) if is_valid]
@@ -0,0 +1,146 @@
+from bisect import bisect_right
+from typing import Callable, List, Optional
+
+from app.models.artist_model import Artist
+from app.models.show_model import Show
+from tomorrowland_lineup_managment.show_index import ShowIntervalIndex
+
+# Break suggestions, by the free minutes between two shows once the walk is done
+MEAL_BREAK_MINUTES = 90
+SNACK_BREAK_MINUTES = 60
+
+
+class PlannedShow:
+    __slots__ = ('artist', 'show', 'travel_minutes', 'free_minutes')
+
+    def __init__(self, artist: Artist, show: Show, travel_minutes: int = 0, free_minutes: int = 0):
+        """
+        A show of the plan.
+
+        Args:
+            artist (Artist): The performing artist.
+            show (Show): The show.
+            travel_minutes (int): The walking time to the next show of the day.
+            free_minutes (int): The free time before the next show of the day, after walking there.
+        """
+        self.artist = artist
+        self.show = show
+        self.travel_minutes = travel_minutes
+        self.free_minutes = free_minutes
+
+
+class DayPlan:
+    def __init__(self, weekend: str, day: str, shows: List[PlannedShow]):
+        self.weekend = weekend
+        self.day = day
+        self.shows = shows
+
+    @property
+    def songs_num(self) -> int:
+        return sum(planned.artist.songs_num for planned in self.shows)
+
+
+def plan_day(shows: List[tuple[Artist, Show]], travel_time: Callable[[str, str], int]) -> List[PlannedShow]:
+    """
+    Choose the shows of one festival day that maximize the number of known songs.
+
+    This is weighted interval scheduling: a show can follow another one if the walk between their stages
+    fits between them, and each show weighs the songs number of its artist. Ties prefer more shows.
+
+    Args:
+        shows (List[tuple[Artist, Show]]): The shows of the day, with parsed start and end times.
+        travel_time (Callable[[str, str], int]): Walking minutes between two stages.
+
+    Returns:
+        List[PlannedShow]: The optimal shows, in chronological order.
+    """
+    shows = sorted(shows, key=lambda artist_show: artist_show[1].end)
+    ends = [show.end for _, show in shows]
+    # best[i]: (songs, shows count) of the best plan that ends with show i; previous[i]: the show before it
+    best: List[tuple[int, int]] = []
+    previous: List[Optional[int]] = []
+
+    for i, (artist, show) in enumerate(shows):
+        best_before, best_previous = (0, 0), None
+        for j in range(bisect_right(ends, show.start) - 1, -1, -1):
+            other_show = shows[j][1]
+            walk_seconds = travel_time(other_show.host_name_and_stage, show.host_name_and_stage) * 60
+            if other_show.end + walk_seconds <= show.start and best[j] > best_before:
+                best_before, best_previous = best[j], j
+        best.append((best_before[0] + artist.songs_num, best_before[1] + 1))
+        previous.append(best_previous)
+
+    if not shows:
+        return []
+    position: Optional[int] = max(range(len(shows)), key=lambda i: best[i])
+    chosen: List[tuple[Artist, Show]] = []
+    while position is not None:
+        chosen.append(shows[position])
+        position = previous[position]
+    chosen.reverse()
+
+    plan = []
+    for (artist, show), next_show in zip(chosen, chosen[1:] + [None]):
+        planned = PlannedShow(artist, show)
+        if next_show is not None:
+            planned.travel_minutes = travel_time(show.host_name_and_stage, next_show[1].host_name_and_stage)
+            planned.free_minutes = (next_show[1].start - show.end) // 60 - planned.travel_minutes
+        plan.append(planned)
+    return plan
+
+
+def plan_lineup(artists: List[Artist], weekend_names: List[str],
+                travel_time: Callable[[str, str], int]) -> List[DayPlan]:
+    """
+    Plan the optimal day-by-day lineup of the given artists.
+
+    Args:
+        artists (List[Artist]): The user's matching artists, with their songs numbers.
+        weekend_names (List[str]): The weekends to plan.
+        travel_time (Callable[[str, str], int]): Walking minutes between two stages.
+
+    Returns:
+        List[DayPlan]: The plan of each festival day that has shows, in chronological order.
+    """
+    show_index = ShowIntervalIndex(artists)
+    return [
+        DayPlan(weekend_name, day, plan_day(show_index.shows_on_day(weekend_name, day), travel_time))
+        for weekend_name in weekend_names
+        for day in show_index.days(weekend_name)
+    ]
+
+
+def format_lineup_plan(day_plans: List[DayPlan]) -> str:
+    """
+    Render a lineup plan as plain text, with walking times and break suggestions.
+
+    Args:
+        day_plans (List[DayPlan]): The plan, from 'plan_lineup'.
+
+    Returns:
+        str: The plan text.
+    """
+    if not day_plans:
+        return "None of your artists has a scheduled show yet."
+
+    lines = ["Personalized Lineup for Tomorrowland Festival:"]
+    for day_plan in day_plans:
+        lines.append("")
+        lines.append(f"{day_plan.weekend.title()} - {day_plan.day}:")
+        for position, planned in enumerate(day_plan.shows):
+            start, end = planned.show.start_datetime, planned.show.end_datetime
+            songs = f"{planned.artist.songs_num} song{'s' if planned.artist.songs_num != 1 else ''}"
+            lines.append(f"{planned.artist.name} ({songs}): {planned.show.host_name_and_stage}, "
+                         f"{start:%d/%m}, {start:%H:%M} to {end:%H:%M}")
+            if position == len(day_plan.shows) - 1:
+                continue
+            if planned.travel_minutes:
+                next_stage = day_plan.shows[position + 1].show.host_name_and_stage
+                lines.append(f"Travel Time: {planned.travel_minutes} minutes to {next_stage}")
+            if planned.free_minutes >= MEAL_BREAK_MINUTES:
+                lines.append(f"Suggestion: You have exactly {planned.free_minutes} free minutes before the next act "
+                             f"after the walk. This is a great time for a proper meal.")
+            elif planned.free_minutes >= SNACK_BREAK_MINUTES:
+                lines.append(f"Suggestion: You have exactly {planned.free_minutes} free minutes before the next act "
+                             f"after the walk. Consider grabbing a quick snack or refreshment.")
+    return "\n".join(lines)
@@ -0,0 +1,193 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.models.artist_model import Artist
+from app.utils.cache_utils import LRUCache
+from UserSession import UserSession
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[2] / "sessions.sqlite3"
+SESSION_TTL_SECONDS = 14 * 24 * 60 * 60
+
+
+def serialize_session(session: UserSession) -> str:
+    return json.dumps(session.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+
+class SessionStore(ABC):
+    def __init__(self, get_lineup_artist: Callable[[str], Optional[Artist]]):
+        """
+        Base class of the user session stores.
+
+        Sessions are stored serialized, so the stores hold artist references and song counts instead of full
+        'Artist' objects, and a loaded session is a fresh object that has to be saved back after changes.
+
+        Args:
+            get_lineup_artist (Callable[[str], Optional[Artist]]): Returns a copy of a lineup artist by name,
+                used to restore the artists of a session.
+        """
+        self.get_lineup_artist = get_lineup_artist
+
+    @abstractmethod
+    def get(self, chat_id: int) -> Optional[UserSession]:
+        """
+        Load the session of a chat.
+
+        Args:
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            Optional[UserSession]: The session, or None if the chat has no stored session.
+        """
+
+    @abstractmethod
+    def save(self, chat_id: int, session: UserSession) -> None:
+        """
+        Store the session of a chat.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            session (UserSession): The session to store.
+        """
+
+    @abstractmethod
+    def delete(self, chat_id: int) -> None:
+        """
+        Remove the session of a chat.
+
+        Args:
+            chat_id (int): The ID of the chat.
+        """
+
+
+class SerializedSessionStore(SessionStore):
+    """
+    Base class of the stores that keep the JSON of 'UserSession.to_dict'. Subclasses only read and write the
+    JSON text.
+    """
+
+    def get(self, chat_id: int) -> Optional[UserSession]:
+        data = self._load(chat_id)
+        if data is None:
+            return None
+        return UserSession.from_dict(json.loads(data), self.get_lineup_artist)
+
+    def save(self, chat_id: int, session: UserSession) -> None:
+        self._store(chat_id, serialize_session(session))
+
+    @abstractmethod
+    def _load(self, chat_id: int) -> Optional[str]:
+        """
+        Read the JSON of a chat's session, or None if the chat has no stored session.
+        """
+
+    @abstractmethod
+    def _store(self, chat_id: int, data: str) -> None:
+        """
+        Write the JSON of a chat's session.
+        """
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, get_lineup_artist: Callable[[str], Optional[Artist]], get_lineup_snapshot: Callable,
+                 max_sessions: int = 100_000, ttl_seconds: float = SESSION_TTL_SECONDS):
+        """
+        Session store kept in the process memory, evicting the least recently used and the expired sessions.
+
+        Sessions are packed into arrays of lineup artist IDs and song numbers, which cost a few bytes per
+        artist instead of a copy of the artist and its rendered text.
+
+        Args:
+            get_lineup_artist (Callable[[str], Optional[Artist]]): Returns a copy of a lineup artist by name.
+            get_lineup_snapshot (Callable): Returns the current 'LineupSnapshot', which maps artists to IDs.
+            max_sessions (int): The maximal number of stored sessions.
+            ttl_seconds (float): How long an untouched session is kept.
+        """
+        super().__init__(get_lineup_artist)
+        self.get_lineup_snapshot = get_lineup_snapshot
+        self._sessions = LRUCache(max_size=max_sessions, ttl_seconds=ttl_seconds)
+
+    def get(self, chat_id: int) -> Optional[UserSession]:
+        refs = self._sessions.get(chat_id)
+        if refs is None:
+            return None
+        return UserSession.from_refs(refs, self.get_lineup_snapshot().get_artist_by_id)
+
+    def save(self, chat_id: int, session: UserSession) -> None:
+        snapshot = self.get_lineup_snapshot()
+        self._sessions.set(chat_id, session.to_refs(snapshot.get_artist_id, snapshot.get_artist_by_id))
+
+    def delete(self, chat_id: int) -> None:
+        self._sessions.delete(chat_id)
+
+
+class SQLiteSessionStore(SerializedSessionStore):
+    def __init__(self, get_lineup_artist: Callable[[str], Optional[Artist]], db_path: Path = DEFAULT_DB_PATH,
+                 ttl_seconds: float = SESSION_TTL_SECONDS):
+        """
+        Session store kept in a SQLite file, so sessions survive restarts and are shared by the bot processes
+        of the same host.
+
+        Args:
+            get_lineup_artist (Callable[[str], Optional[Artist]]): Returns a copy of a lineup artist by name.
+            db_path (Path): The SQLite file.
+            ttl_seconds (float): How long an untouched session is kept.
+        """
+        super().__init__(get_lineup_artist)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (chat_id INTEGER PRIMARY KEY, data TEXT, updated_at REAL)")
+        self._db.execute("DELETE FROM sessions WHERE updated_at <= ?", (time.time() - ttl_seconds,))
+        self._db.commit()
+
+    def delete(self, chat_id: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE chat_id = ?", (chat_id,))
+            self._db.commit()
+
+    def _load(self, chat_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT data, updated_at FROM sessions WHERE chat_id = ?",
+                                   (chat_id,)).fetchone()
+        if row is None or row[1] <= time.time() - self.ttl_seconds:
+            return None
+        return row[0]
+
+    def _store(self, chat_id: int, data: str) -> None:
+        with self._lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (chat_id, data, time.time()))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error saving the session of chat {chat_id}: {str(e)}")
+
+
+def create_session_store(backend: str, get_lineup_artist: Callable[[str], Optional[Artist]],
+                         get_lineup_snapshot: Callable) -> SessionStore:
+    """
+    Create a session store by backend name.
+
+    Args:
+        backend (str): "memory" or "sqlite".
+        get_lineup_artist (Callable[[str], Optional[Artist]]): Returns a copy of a lineup artist by name.
+        get_lineup_snapshot (Callable): Returns the current 'LineupSnapshot'.
+
+    Returns:
+        SessionStore: The session store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "memory":
+        return InMemorySessionStore(get_lineup_artist, get_lineup_snapshot)
+    if backend == "sqlite":
+        return SQLiteSessionStore(get_lineup_artist)
+    raise ValueError(f"Unknown session store backend: {backend}")
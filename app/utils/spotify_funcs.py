@@ -1,25 +1,69 @@
+import logging
 import re
-from typing import List
-from urllib.parse import parse_qs
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
 
-import spotipy
-from httpx._urlparse import urlparse
-from spotipy import SpotifyException
-from spotipy.oauth2 import SpotifyClientCredentials, logger
 from app.models.artist_model import Artist
+from app.utils.artist_link_cache import ArtistLinkCache, LINK_TTL_SECONDS, NEGATIVE_LINK_TTL_SECONDS
+from app.utils.cache_utils import LRUCache
+
+ARTIST_NOT_FOUND = "Artist not found"
+
+# Only the fields needed to count the songs of each artist
+PLAYLIST_ITEMS_FIELDS = 'items(track(artists(name))),next,total'
+PLAYLIST_PAGE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def spotify_exception() -> type:
+    """
+    Get spotipy's exception class. spotipy is imported on first use, to keep the bot's startup fast.
+    """
+    from spotipy import SpotifyException
+    return SpotifyException
 
 
 class SpotifyManager:
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str, max_page_workers: int = 16,
+                 page_concurrency: int = 8, playlist_cache_size: int = 500):
         """
         Initialize the SpotifyManager with client credentials.
 
         Args:
             client_id (str): Spotify API client ID.
             client_secret (str): Spotify API client secret.
+            max_page_workers (int): The maximal number of playlist pages fetched at once, across all playlists.
+            page_concurrency (int): The maximal number of pages of a single playlist fetched at once.
+            playlist_cache_size (int): The maximal number of playlist results kept in memory.
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._sp = None
+        self._sp_lock = threading.Lock()
+        self.page_concurrency = page_concurrency
+        self._page_executor = ThreadPoolExecutor(max_workers=max_page_workers, thread_name_prefix="spotify-pages")
+        # (playlist ID, snapshot ID) -> song count of each artist in that version of the playlist
+        self.playlist_cache = LRUCache(max_size=playlist_cache_size)
+
+    @property
+    def sp(self):
+        """
+        The Spotify client, created on first use.
         """
-        self.client_credentials_manager = SpotifyClientCredentials(client_id, client_secret)
-        self.sp = spotipy.Spotify(client_credentials_manager=self.client_credentials_manager)
+        if self._sp is not None:
+            return self._sp
+        with self._sp_lock:
+            if self._sp is None:
+                import spotipy
+                from spotipy.oauth2 import SpotifyClientCredentials
+
+                self.client_credentials_manager = SpotifyClientCredentials(self.client_id, self.client_secret)
+                self._sp = spotipy.Spotify(client_credentials_manager=self.client_credentials_manager)
+            return self._sp
 
     def get_artists_from_spotify_playlist(self, playlist_link: str) -> List[Artist]:
         """
@@ -27,6 +71,7 @@ class SpotifyManager:
 
         This function uses the Spotify API to fetch the playlist tracks from the given 'playlist_link'.
         It then processes the tracks and extracts the unique artists' names along with the number of songs by each artist.
+        The counts are cached by the playlist 'snapshot_id', so an unchanged playlist costs a single metadata request.
 
         Args:
             playlist_link (str): The link to the Spotify playlist.
@@ -40,10 +85,15 @@ class SpotifyManager:
         """
         try:
             playlist_id = self._extract_playlist_id(playlist_link)
-            tracks = self._fetch_all_playlist_tracks(playlist_id)
-            artist_song_count = self._count_artist_songs(tracks)
+            snapshot_id = self.sp.playlist(playlist_id, fields='snapshot_id')['snapshot_id']
+            artist_song_count = self.playlist_cache.get((playlist_id, snapshot_id))
+            if artist_song_count is None:
+                tracks = self._iter_playlist_tracks(playlist_id)
+                artist_song_count = self._count_artist_songs(tracks)
+                self.playlist_cache.set((playlist_id, snapshot_id), artist_song_count)
+            logger.info(f"Playlist cache stats: {self.playlist_cache.stats()}")
             return self._create_artists(artist_song_count)
-        except SpotifyException as e:
+        except spotify_exception() as e:
             logger.error(f"Spotify API error: {str(e)}")
             raise
         except Exception as e:
@@ -71,8 +121,8 @@ class SpotifyManager:
                 artist = items[0]
                 return artist['external_urls']['spotify']
             else:
-                return "Artist not found"
-        except SpotifyException as e:
+                return ARTIST_NOT_FOUND
+        except spotify_exception() as e:
             logger.error(f"Spotify API error: {str(e)}")
             raise
         except Exception as e:
@@ -108,36 +158,76 @@ class SpotifyManager:
 
         return playlist_id
 
-    def _fetch_all_playlist_tracks(self, playlist_id: str) -> List[dict]:
+    def _fetch_playlist_page(self, playlist_id: str, offset: int) -> dict:
+        return self.sp.playlist_items(playlist_id, fields=PLAYLIST_ITEMS_FIELDS, limit=PLAYLIST_PAGE_SIZE,
+                                      offset=offset)
+
+    def _iter_playlist_pages(self, playlist_id: str) -> Iterator[List[dict]]:
         """
-        Fetch all tracks from a playlist, handling pagination.
+        Fetch the pages of a playlist, yielding each page as soon as it arrives.
+
+        The first page tells the total number of tracks, so the offsets of the remaining pages are known and
+        they are fetched concurrently, up to 'page_concurrency' at a time. Pages may arrive out of order.
 
         Args:
             playlist_id (str): The Spotify playlist ID.
 
-        Returns:
-            List[Dict]: A list of track dictionaries.
+        Yields:
+            List[Dict]: The track items of each page.
 
         Raises:
             SpotifyException: If there's an error fetching the playlist tracks.
         """
-        tracks = []
-        results = self.sp.playlist_items(playlist_id)
-        tracks.extend(results['items'])
+        results = self._fetch_playlist_page(playlist_id, 0)
+        yield results['items']
+
+        if results.get('total') is None:
+            while results['next']:
+                results = self.sp.next(results)
+                yield results['items']
+            return
+
+        offsets = iter(range(PLAYLIST_PAGE_SIZE, results['total'], PLAYLIST_PAGE_SIZE))
+        pending = set()
+        try:
+            while True:
+                for offset in offsets:
+                    pending.add(self._page_executor.submit(self._fetch_playlist_page, playlist_id, offset))
+                    if len(pending) >= self.page_concurrency:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()['items']
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _iter_playlist_tracks(self, playlist_id: str) -> Iterator[dict]:
+        """
+        Fetch all tracks from a playlist, handling pagination.
+
+        Args:
+            playlist_id (str): The Spotify playlist ID.
 
-        while results['next']:
-            results = self.sp.next(results)
-            tracks.extend(results['items'])
+        Yields:
+            Dict: The track dictionaries, page by page.
 
-        return tracks
+        Raises:
+            SpotifyException: If there's an error fetching the playlist tracks.
+        """
+        for page in self._iter_playlist_pages(playlist_id):
+            yield from page
 
     @staticmethod
-    def _count_artist_songs(tracks: List[dict]) -> dict[str, int]:
+    def _count_artist_songs(tracks: Iterable[dict]) -> dict[str, int]:
         """
         Count the number of songs for each artist in the playlist.
 
         Args:
-            tracks (List[Dict]): A list of track dictionaries.
+            tracks (Iterable[Dict]): The track dictionaries. They are consumed one by one, so a generator of
+                tracks is counted while the following pages are still being fetched.
 
         Returns:
             Dict[str, int]: A dictionary with artist names as keys and song counts as values.
@@ -148,7 +238,8 @@ class SpotifyManager:
                 for artist in track['track']['artists']:
                     artist_name = artist['name']
                     artist_song_count[artist_name] = artist_song_count.get(artist_name, 0) + 1
-            except KeyError:
+            except (KeyError, TypeError):
+                # Removed or local tracks come back without track data
                 logger.warning(f"Unexpected track format: {track}")
         return artist_song_count
 
@@ -190,3 +281,76 @@ def get_spotify_artist_link(spotify_manager: SpotifyManager, artist_name: str) -
         SpotifyException: If there's an error communicating with the Spotify API.
     """
     return spotify_manager.get_spotify_artist_link(artist_name)
+
+
+class SpotifyArtistLinkResolver:
+    def __init__(self, spotify_manager: SpotifyManager, cache: ArtistLinkCache, max_workers: int = 8,
+                 max_retries: int = 3):
+        """
+        Resolve Spotify artist links concurrently, through a shared link cache.
+
+        Lookups run on a bounded thread pool shared by all users. When Spotify answers with 429, every worker
+        waits for the 'Retry-After' period before sending its next request.
+
+        Args:
+            spotify_manager (SpotifyManager): The Spotify client.
+            cache (ArtistLinkCache): The artist link cache.
+            max_workers (int): The maximal number of concurrent Spotify searches.
+            max_retries (int): How many times a rate-limited search is retried.
+        """
+        self.spotify_manager = spotify_manager
+        self.cache = cache
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify-links")
+        self._blocked_until = 0.0
+        self._blocked_lock = threading.Lock()
+
+    def resolve(self, artist_names: List[str]) -> dict[str, str]:
+        """
+        Get the Spotify links of several artists.
+
+        Args:
+            artist_names (List[str]): The names of the artists.
+
+        Returns:
+            dict[str, str]: The link of each artist that could be resolved, or "Artist not found".
+        """
+        links = {}
+        missing_names = []
+        for artist_name in dict.fromkeys(artist_names):
+            link = self.cache.get(artist_name)
+            if link is None:
+                missing_names.append(artist_name)
+            else:
+                links[artist_name] = link
+
+        for artist_name, link in zip(missing_names, self._executor.map(self._resolve_one, missing_names)):
+            if link is not None:
+                links[artist_name] = link
+        return links
+
+    def _resolve_one(self, artist_name: str) -> Optional[str]:
+        for _ in range(self.max_retries + 1):
+            self._wait_for_rate_limit()
+            try:
+                link = self.spotify_manager.get_spotify_artist_link(artist_name)
+            except spotify_exception() as e:
+                if e.http_status != 429:
+                    return None
+                retry_after = float((e.headers or {}).get('Retry-After', 1))
+                logger.warning(f"Spotify rate limit reached, retrying after {retry_after} seconds")
+                with self._blocked_lock:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                continue
+            except Exception:
+                return None
+
+            ttl_seconds = NEGATIVE_LINK_TTL_SECONDS if link == ARTIST_NOT_FOUND else LINK_TTL_SECONDS
+            self.cache.set(artist_name, link, ttl_seconds=ttl_seconds)
+            return link
+        return None
+
+    def _wait_for_rate_limit(self) -> None:
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
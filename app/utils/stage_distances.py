@@ -0,0 +1,167 @@
+import csv
+import functools
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+
+WALKING_TIME_CSV = Path(__file__).resolve().parents[2] / "walking_time.csv"
+# Used between stages with no known walking time, not even through other stages
+DEFAULT_TRAVEL_MINUTES = 20
+UNKNOWN_WALKING_TIME = "Unknown"
+WALKING_TIME_BOUNDS = ("min", "mid", "max")
+# The lineup names some stages after their sponsor, e.g. "FREEDOM BY BUD" or "RISE BY COCA-COLA"
+SPONSOR_SUFFIX_PATTERN = re.compile(r"\s+by\s+.*$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def normalize_stage_name(stage_name: str) -> str:
+    """
+    Normalize a stage name, so the walking time table and the lineup stage names match,
+    e.g. "MOOSE BAR" and "Moosebar", or "FREEDOM BY BUD" and "Freedom".
+
+    Args:
+        stage_name (str): The stage name.
+
+    Returns:
+        str: The normalized stage name.
+    """
+    if not stage_name:
+        return ""
+    return "".join(SPONSOR_SUFFIX_PATTERN.sub("", stage_name.strip()).split()).casefold()
+
+
+def parse_walking_time(cell: str) -> Optional[tuple[int, int]]:
+    """
+    Parse a walking time cell, e.g. "5-10" or "Unknown".
+
+    Returns:
+        Optional[tuple[int, int]]: The minimal and maximal minutes, or None if the time is unknown.
+    """
+    if "-" not in cell:
+        return None
+    low, high = cell.split("-", 1)
+    return int(low), int(high)
+
+
+class StageDistances:
+    def __init__(self, csv_path: Path = WALKING_TIME_CSV, default_minutes: int = DEFAULT_TRAVEL_MINUTES,
+                 bound: str = "max", shortest_paths: bool = True):
+        """
+        Walking times between the festival stages, parsed once from the walking time table.
+
+        The table is lower-triangular with "min-max" minute ranges. It is loaded into symmetric matrices of the
+        minimal, middle (rounded up) and maximal minutes. "Unknown" cells get the shortest walk through stages
+        with known times (Floyd-Warshall), and pairs that are still unknown get the default time.
+
+        Args:
+            csv_path (Path): The walking time CSV file.
+            default_minutes (int): The walking time between stages with no known time.
+            bound (str): The default bound of 'travel_time': "min", "mid" or "max". "max" leaves enough time
+                to walk.
+            shortest_paths (bool): Fill the unknown times with shortest paths. If False, they get the default.
+        """
+        if bound not in WALKING_TIME_BOUNDS:
+            raise ValueError(f"Unknown walking time bound: {bound}")
+        self.default_minutes = default_minutes
+        self.bound = bound
+        self.stages: list[str] = []
+        self._stage_positions: dict[str, int] = {}
+        self._minutes: dict[str, list[list[int]]] = {name: [] for name in WALKING_TIME_BOUNDS}
+
+        try:
+            with open(csv_path, "r", newline="") as csvfile:
+                rows = [row for row in csv.reader(csvfile) if any(row)]
+        except OSError as e:
+            logging.error(f"Error reading the walking time table {csv_path}: {str(e)}")
+            return
+
+        self.stages = [name.strip() for name in rows[0][1:]]
+        self._stage_positions = {normalize_stage_name(name): position for position, name in enumerate(self.stages)}
+        ranges: list[list[Optional[tuple[int, int]]]] = [[None] * len(self.stages) for _ in self.stages]
+        for row in rows[1:]:
+            position = self._stage_positions.get(normalize_stage_name(row[0]))
+            if position is None:
+                logging.warning(f"Unknown stage in the walking time table: {row[0]}")
+                continue
+            for other_position, cell in enumerate(row[1:position + 1]):
+                walking_time = parse_walking_time(cell.strip())
+                if walking_time is not None:
+                    ranges[position][other_position] = ranges[other_position][position] = walking_time
+
+        for name in WALKING_TIME_BOUNDS:
+            matrix = [[self._bound_minutes(walking_time, name) for walking_time in row] for row in ranges]
+            if shortest_paths:
+                self._fill_shortest_paths(matrix)
+            self._minutes[name] = [
+                [0 if position == other_position else (default_minutes if minutes is None else minutes)
+                 for other_position, minutes in enumerate(row)]
+                for position, row in enumerate(matrix)
+            ]
+
+    @staticmethod
+    def _bound_minutes(walking_time: Optional[tuple[int, int]], bound: str) -> Optional[int]:
+        if walking_time is None:
+            return None
+        low, high = walking_time
+        if bound == "min":
+            return low
+        if bound == "max":
+            return high
+        return -(-(low + high) // 2)
+
+    @staticmethod
+    def _fill_shortest_paths(matrix: list[list[Optional[int]]]) -> None:
+        """
+        Fill the unknown times with the shortest walk through other stages. Measured times are kept, even when
+        a walk through another stage would be shorter.
+        """
+        size = len(matrix)
+        shortest = [list(row) for row in matrix]
+        for position in range(size):
+            shortest[position][position] = 0
+        for via in range(size):
+            via_row = shortest[via]
+            for position in range(size):
+                to_via = shortest[position][via]
+                if to_via is None:
+                    continue
+                row = shortest[position]
+                for other_position in range(size):
+                    from_via = via_row[other_position]
+                    if from_via is None:
+                        continue
+                    if row[other_position] is None or to_via + from_via < row[other_position]:
+                        row[other_position] = to_via + from_via
+        for position in range(size):
+            for other_position in range(size):
+                if matrix[position][other_position] is None:
+                    matrix[position][other_position] = shortest[position][other_position]
+
+    @property
+    def max_minutes(self) -> int:
+        """
+        The longest walk between two stages, with the default bound.
+        """
+        return max((max(row) for row in self._minutes[self.bound] if row), default=self.default_minutes)
+
+    def travel_time(self, stage_a: str, stage_b: str, bound: Optional[str] = None) -> int:
+        """
+        Get the walking time between two stages.
+
+        Args:
+            stage_a (str): A stage name, as in the table or in the lineup.
+            stage_b (str): Another stage name.
+            bound (Optional[str]): "min", "mid" or "max". Defaults to the bound given at creation.
+
+        Returns:
+            int: The walking time in minutes, 0 for the same stage and the default for unknown stages.
+        """
+        stage_a, stage_b = normalize_stage_name(stage_a), normalize_stage_name(stage_b)
+        if stage_a == stage_b:
+            return 0
+        position = self._stage_positions.get(stage_a)
+        other_position = self._stage_positions.get(stage_b)
+        if position is None or other_position is None:
+            return self.default_minutes
+        return self._minutes[bound or self.bound][position][other_position]
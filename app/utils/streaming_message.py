@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from app.utils.telegram_sender import TelegramSender, is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MESSAGE_MAX_LENGTH = 4096
+# Telegram allows about one edit per second in a chat before answering with 429
+MIN_EDIT_INTERVAL_SECONDS = 1.5
+# Shown instead of the placeholder when nothing was generated
+EMPTY_TEXT = "Nothing was generated. Please try again later."
+
+
+def split_message_text(text: str, max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH) -> tuple[str, str]:
+    """
+    Split a text that is too long for one message, at the last line break that fits if there is one.
+
+    Args:
+        text (str): The text.
+        max_length (int): The maximal length of a message.
+
+    Returns:
+        tuple[str, str]: The text of the full message and the rest.
+    """
+    if len(text) <= max_length:
+        return text, ""
+    split_at = text.rfind("\n", 0, max_length + 1)
+    if split_at <= 0:
+        return text[:max_length], text[max_length:]
+    return text[:split_at], text[split_at + 1:]
+
+
+class StreamingMessage:
+    def __init__(self, sender: TelegramSender, chat_id: int, placeholder: str,
+                 min_edit_interval: float = MIN_EDIT_INTERVAL_SECONDS, max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH):
+        """
+        A message that is edited in place while its text is generated.
+
+        The placeholder is sent right away and replaced by the text as it arrives, at most one edit every
+        'min_edit_interval' seconds. When the text outgrows a message, the message is completed and the rest
+        continues in a new one. The sends and edits go through the sender, so they never block the caller.
+
+        Args:
+            sender (TelegramSender): The outbound queue of the bot.
+            chat_id (int): The chat of the message.
+            placeholder (str): The text shown until the first chunk arrives.
+            min_edit_interval (float): The minimal time between two edits.
+            max_length (int): The maximal length of a message.
+        """
+        self.sender = sender
+        self.chat_id = chat_id
+        self.min_edit_interval = min_edit_interval
+        self.max_length = max_length
+        self.text = ""
+        self._has_text = False
+        self._message: Optional[Future] = None
+        self._shown_text = placeholder
+        self._last_edit = 0.0
+        self._finished = False
+        self._final_edit_retried = False
+        self._lock = threading.Lock()
+        self._send(placeholder)
+
+    def set_status(self, status: str) -> None:
+        """
+        Replace the placeholder, e.g. with the queue position, until the first chunk arrives.
+        Status updates are throttled like the text edits.
+
+        Args:
+            status (str): The new placeholder.
+        """
+        with self._lock:
+            if not self.text and time.monotonic() - self._last_edit >= self.min_edit_interval:
+                self._edit(status)
+
+    def append(self, chunk: str) -> None:
+        """
+        Add generated text, and show it if the last edit is old enough.
+
+        Args:
+            chunk (str): The new text.
+        """
+        with self._lock:
+            self.text += chunk
+            self._has_text = self._has_text or bool(chunk.strip())
+            while len(self.text) > self.max_length:
+                full_text, self.text = split_message_text(self.text, self.max_length)
+                self._edit(full_text)
+                self._send(self.text or "...")
+            if time.monotonic() - self._last_edit >= self.min_edit_interval:
+                self._edit(self.text)
+
+    def finish(self, empty_text: str = EMPTY_TEXT) -> None:
+        """
+        Show the whole generated text, or 'empty_text' when nothing was generated, so the placeholder does not
+        stay as if the text was still coming.
+
+        Args:
+            empty_text (str): The text shown when nothing was generated.
+        """
+        with self._lock:
+            self._finished = True
+            if not self._has_text:
+                self.text = empty_text
+            self._edit(self.text)
+
+    def _send(self, text: str) -> None:
+        self._message = self.sender.send_message(self.chat_id, text)
+        self._shown_text = text
+        self._last_edit = time.monotonic()
+
+    def _edit(self, text: str) -> None:
+        # Telegram trims the text, and refuses edits that do not change it
+        if not text.strip() or text.strip() == self._shown_text.strip():
+            return
+        # Edits are queued after the send in the same chat, so the message is sent when the edit runs
+        self.sender.submit(self.chat_id, self._edit_message, self._message, text)
+        self._shown_text = text
+        self._last_edit = time.monotonic()
+
+    def _edit_message(self, message: Future, text: str) -> None:
+        try:
+            self.sender.bot.edit_message_text(text, chat_id=self.chat_id, message_id=message.result().message_id)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                # The sender sends this same edit again after the rate limit
+                raise
+            logger.error(f"Error editing the streamed message in chat {self.chat_id}: {str(e)}")
+            with self._lock:
+                # The edit was queued as shown. If it was the latest one, forget it, so the text is sent again:
+                # by the next edit, or right away, once, when the message is already finished
+                if text == self._shown_text:
+                    self._shown_text = ""
+                    if self._finished and not self._final_edit_retried:
+                        self._final_edit_retried = True
+                        self._edit(self.text)
+            raise
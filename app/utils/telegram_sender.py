@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from app.utils.cache_utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows about 30 messages per second overall, and about one per second in a chat
+GLOBAL_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGES_PER_SECOND = 1
+# Short bursts in a chat are tolerated, e.g. a reply followed by its keyboard
+CHAT_BURST = 3
+# A chat action, e.g. 'typing', is shown for 5 seconds or until the next message
+CHAT_ACTION_SECONDS = 5
+MAX_RETRIES = 3
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check if Telegram refused a call with 429. The sender retries those calls by itself.
+    """
+    # telebot's ApiTelegramException carries Telegram's error code
+    return getattr(error, "error_code", None) == 429
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class _ChatQueue:
+    def __init__(self, rate: float, burst: float):
+        self.jobs: deque[tuple[Future, Callable, tuple, dict, int]] = deque()
+        self.bucket = _TokenBucket(rate, burst)
+        self.busy = False
+        self.blocked_until = 0.0
+
+
+class TelegramSender:
+    def __init__(self, bot: Any, messages_per_second: float = GLOBAL_MESSAGES_PER_SECOND,
+                 chat_messages_per_second: float = CHAT_MESSAGES_PER_SECOND, chat_burst: float = CHAT_BURST,
+                 chat_action_seconds: float = CHAT_ACTION_SECONDS, max_workers: int = 8,
+                 max_retries: int = MAX_RETRIES):
+        """
+        Central queue of the calls to Telegram that send something to a chat.
+
+        Calls return a future right away, so the handler that makes them is never blocked. They are run in
+        order within each chat, under a global and a per-chat token bucket. When Telegram answers 429, the call
+        is retried after the 'retry_after' it asks for, and the chat waits meanwhile. A chat action is dropped
+        while the same action is still shown in the chat.
+
+        Args:
+            bot: The Telegram bot.
+            messages_per_second (float): The calls per second over all the chats.
+            chat_messages_per_second (float): The calls per second in a chat.
+            chat_burst (float): The calls a chat can make at once after being idle.
+            chat_action_seconds (float): How long a chat action is considered visible.
+            max_workers (int): The maximal number of calls running at once.
+            max_retries (int): How many times a rate limited call is retried.
+        """
+        self.bot = bot
+        self.chat_messages_per_second = chat_messages_per_second
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global_bucket = _TokenBucket(messages_per_second, messages_per_second)
+        self._chats: OrderedDict[Hashable, _ChatQueue] = OrderedDict()
+        self._recent_actions = LRUCache(max_size=100_000, ttl_seconds=chat_action_seconds)
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="telegram-send")
+        self._scheduler = threading.Thread(target=self._schedule, name="telegram-sender", daemon=True)
+        self._scheduler.start()
+
+    def submit(self, chat_id: Hashable, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a call to Telegram for a chat.
+
+        Args:
+            chat_id (Hashable): The chat the call sends to.
+            func (Callable): The call, e.g. 'bot.send_message'.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            Future: The result of the call.
+        """
+        future = Future()
+        with self._condition:
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _ChatQueue(self.chat_messages_per_second, self.chat_burst)
+            chat.jobs.append((future, func, args, kwargs, 0))
+            self._condition.notify()
+        return future
+
+    def send_message(self, chat_id: Hashable, text: str, **kwargs) -> Future:
+        future = self.submit(chat_id, self.bot.send_message, chat_id, text, **kwargs)
+        # Telegram stops showing the chat action once a message arrives, so the next one must be sent again
+        future.add_done_callback(lambda _: self._recent_actions.delete(chat_id))
+        return future
+
+    def send_chat_action(self, chat_id: Hashable, action: str) -> Optional[Future]:
+        """
+        Queue a chat action, unless the same action is still shown in the chat, i.e. it was sent in the last
+        'chat_action_seconds' and no message was sent since.
+
+        Returns:
+            Optional[Future]: The result of the call, or None if the action was dropped.
+        """
+        if self._recent_actions.get(chat_id) == action:
+            return None
+        self._recent_actions.set(chat_id, action)
+        return self.submit(chat_id, self.bot.send_chat_action, chat_id, action)
+
+    def _schedule(self) -> None:
+        while True:
+            with self._condition:
+                wait_time = self._dispatch_ready()
+                self._condition.wait(wait_time)
+
+    def _dispatch_ready(self) -> Optional[float]:
+        """
+        Start the calls that the rate limits allow, the chats in round robin.
+
+        Returns:
+            Optional[float]: The time until the next call may be allowed, or None if no call is waiting.
+        """
+        now = time.monotonic()
+        self._global_bucket.refill(now)
+        wait_time: Optional[float] = None
+        for chat_id in list(self._chats):
+            chat = self._chats[chat_id]
+            chat.bucket.refill(now)
+            if not chat.jobs:
+                if not chat.busy and chat.bucket.tokens >= chat.bucket.capacity:
+                    del self._chats[chat_id]
+                continue
+            if chat.busy:
+                continue
+            chat_wait = max(chat.blocked_until - now, chat.bucket.wait_time(), self._global_bucket.wait_time())
+            if chat_wait > 0:
+                wait_time = chat_wait if wait_time is None else min(wait_time, chat_wait)
+                continue
+
+            chat.bucket.tokens -= 1
+            self._global_bucket.tokens -= 1
+            chat.busy = True
+            self._chats.move_to_end(chat_id)
+            self._executor.submit(self._run, chat_id, chat, chat.jobs.popleft())
+        return wait_time
+
+    def _run(self, chat_id: Hashable, chat: _ChatQueue, job: tuple[Future, Callable, tuple, dict, int]) -> None:
+        future, func, args, kwargs, retries = job
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            retry_after = self._get_retry_after(e)
+            with self._condition:
+                chat.busy = False
+                if retry_after is not None and retries < self.max_retries:
+                    logger.warning(f"Telegram rate limit in chat {chat_id}, retrying after {retry_after} seconds")
+                    chat.blocked_until = time.monotonic() + retry_after
+                    chat.jobs.appendleft((future, func, args, kwargs, retries + 1))
+                    self._condition.notify()
+                    return
+                self._condition.notify()
+            logger.error(f"Error sending to chat {chat_id}: {str(e)}")
+            future.set_exception(e)
+            return
+
+        with self._condition:
+            chat.busy = False
+            self._condition.notify()
+        future.set_result(result)
+
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        if not is_rate_limit_error(error):
+            return None
+        result_json = getattr(error, "result_json", None) or {}
+        return float(result_json.get("parameters", {}).get("retry_after", 1))
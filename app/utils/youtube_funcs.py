@@ -1,29 +1,75 @@
 import logging
 import re
+import threading
+from typing import Iterator
+
 from app.models.artist_model import Artist
-from googleapiclient.discovery import build
 
 # Replace with your own YouTube Data API key
 import APIs
 
 API_KEY = APIs.YOUTUBE_API
 
+# Only the fields needed to find the artist of each video
+PLAYLIST_ITEMS_FIELDS = 'nextPageToken,items(snippet(title,videoOwnerChannelTitle))'
+PLAYLIST_PAGE_SIZE = 50
 
-def get_artists_from_youtube_playlist(playlist_link):
+# "[Premiere] Artist1 & Artist2 - Title (Official Video)": leading tags are skipped, and the artists are
+# everything before the first dash or pipe surrounded by spaces
+TITLE_PATTERN = re.compile(r"^\s*(?:[\[(][^\])]*[\])]\s*)*(?P<artists>.+?)\s+[-\u2013\u2014|]\s+(?P<title>.+)$")
+# "Artist ft. Other" in the artists part
+FEATURING_PATTERN = re.compile(r"\s+(?:feat|ft|featuring)\b\.?\s+", re.IGNORECASE)
+# "Title (feat. Other)" or "Title ft. Other" in the song part
+FEATURED_PATTERN = re.compile(r"\b(?:feat|ft|featuring)\b\.?\s+([^()\[\]]+)", re.IGNORECASE)
+TOPIC_CHANNEL_SUFFIX = " - Topic"
+QUOTE_CHARACTERS = " \"'"
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+def get_youtube_client():
     """
-    Retrieves a list of artists from a YouTube/YouTube Music playlist.
+    Get a long-lived YouTube Data API client for the current thread.
 
-    Args:
-        playlist_link (str): The ID of the YouTube/YouTube Music playlist.
+    The Google API client library is imported and the discovery document loaded on first use, once per
+    process. The clients are kept per thread because the HTTP object underneath them is not thread-safe.
 
     Returns:
-        list: A list of unique artist names in the playlist.
+        Resource: The YouTube Data API client.
+    """
+    global _discovery_document
+    client = getattr(_thread_local, 'youtube', None)
+    if client is not None:
+        return client
+
+    from googleapiclient.discovery import build, build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+
+    with _discovery_lock:
+        if _discovery_document is None:
+            _discovery_document = get_static_doc('youtube', 'v3')
+    if _discovery_document:
+        client = build_from_document(_discovery_document, developerKey=API_KEY)
+    else:
+        logging.warning("No bundled YouTube discovery document, building the client from the discovery service")
+        client = build('youtube', 'v3', developerKey=API_KEY)
+    _thread_local.youtube = client
+    return client
+
+
+def iter_playlist_pages(playlist_id: str) -> Iterator[list[dict]]:
     """
+    Fetch the items of a YouTube playlist page by page.
 
-    playlist_id = cut_content_after_equal_mark(playlist_link)
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
+    Args:
+        playlist_id (str): The ID of the YouTube/YouTube Music playlist.
 
-    artists_list = []
+    Yields:
+        list[dict]: The items of each page, with only the snippet title and the video owner channel title.
+    """
+    youtube = get_youtube_client()
     next_page_token = None
 
     while True:
@@ -31,28 +77,39 @@ def get_artists_from_youtube_playlist(playlist_link):
         response = youtube.playlistItems().list(
             part='snippet',
             playlistId=playlist_id,
-            maxResults=50,
-            pageToken=next_page_token
+            maxResults=PLAYLIST_PAGE_SIZE,
+            pageToken=next_page_token,
+            fields=PLAYLIST_ITEMS_FIELDS
         ).execute()
-
-        artist_song_count = {}
-
-        # Extract the artist names from the video titles
-        for item in response['items']:
-            video_title = item['snippet']['title']
-            artist_name = extract_artist_from_title(video_title)
-            # TODO: (fix) Add the artist to the 'artists' set if it is not already present
-            #  and update songs_num for existing artists
-            if artist_name in artist_song_count:
-                artist_song_count[artist_name] += 1
-            else:
-                artist_song_count[artist_name] = 1
+        yield response.get('items', [])
 
         # Check if there are more pages of results
         next_page_token = response.get('nextPageToken')
         if not next_page_token:
             break
 
+
+def get_artists_from_youtube_playlist(playlist_link):
+    """
+    Retrieves a list of artists from a YouTube/YouTube Music playlist.
+
+    Args:
+        playlist_link (str): The ID of the YouTube/YouTube Music playlist.
+
+    Returns:
+        list: A list of unique artists in the playlist, with their number of songs over all the pages.
+    """
+
+    playlist_id = cut_content_after_equal_mark(playlist_link)
+    artist_song_count = {}
+
+    for items in iter_playlist_pages(playlist_id):
+        # Extract the artist names from the video titles
+        for artist_names in extract_artists_from_items(items):
+            for artist_name in artist_names:
+                artist_song_count[artist_name] = artist_song_count.get(artist_name, 0) + 1
+
+    artists_list = []
     for artist_name, songs_num in artist_song_count.items():
         new_artist = Artist(name=artist_name, host_name_and_stage='none', weekend='none', date='none')
         new_artist.songs_num = songs_num
@@ -82,25 +139,62 @@ def cut_content_after_equal_mark(link):
     return link
 
 
+def parse_video_artists(title: str, channel_title: str = "") -> list[str]:
+    """
+    Extracts the artist names of a video from its title and uploader channel.
+
+    Handles titles such as "Artist1 & Artist2 - Title (Official Video)", "[Premiere] Artist | Title",
+    featured artists ("Artist ft. Other - Title", "Artist - Title (feat. Other)") and the auto-generated
+    "Artist - Topic" channels of YouTube Music, whose titles are only the song name.
+
+    Args:
+        title (str): The title of the video.
+        channel_title (str): The 'videoOwnerChannelTitle' of the video, if known.
+
+    Returns:
+        list[str]: The artist names, main artists first, or an empty list if none was found.
+    """
+    match = TITLE_PATTERN.match(title)
+    if channel_title.endswith(TOPIC_CHANNEL_SUFFIX):
+        artists_part, song_part = channel_title[:-len(TOPIC_CHANNEL_SUFFIX)], title
+    elif match:
+        artists_part, song_part = match.group('artists'), match.group('title')
+    elif channel_title:
+        artists_part, song_part = channel_title, title
+    else:
+        return []
+
+    artists = [artist.strip(QUOTE_CHARACTERS) for artist in FEATURING_PATTERN.split(artists_part)]
+    artists += [featured.strip(QUOTE_CHARACTERS) for featured in FEATURED_PATTERN.findall(song_part)]
+    return [artist for artist in artists if artist]
+
+
+def extract_artists_from_items(items: list[dict]) -> list[list[str]]:
+    """
+    Extracts the artist names of a whole page of playlist items in one call.
+
+    Args:
+        items (list[dict]): The playlist items, with their 'snippet' title and 'videoOwnerChannelTitle'.
+
+    Returns:
+        list[list[str]]: The artist names of each item, in the order of the items.
+    """
+    parse = parse_video_artists
+    return [
+        parse(item['snippet'].get('title', ''), item['snippet'].get('videoOwnerChannelTitle', ''))
+        for item in items
+    ]
+
+
 def extract_artist_from_title(title):
     """
     Extracts the artist name from a video title.
-    This is a simple implementation that assumes the artist name is followed by a hyphen or a pipe symbol.
-    You may need to modify this function based on your specific use case.
 
     Args:
         title (str): The title of the video.
 
     Returns:
-        str: The artist name extracted from the title, or None if not found.
+        str: The main artist name extracted from the title, or None if not found.
     """
-    separators = [' - ', ' | ']
-    for separator in separators:
-        if separator in title:
-            artist, _ = title.split(separator, 1)
-            return artist.strip()
-    return None
-
-# playlist_id = 'PLnKVD11LThZQL-r7h1vQ1bDJ-QFkGwbJe'
-# artists = get_artists_from_youtube_playlist(playlist_id)
-# print(artists)
+    artists = parse_video_artists(title)
+    return artists[0] if artists else None
@@ -1,5 +1,82 @@
+import threading
+
 from app.models.artist_model import Artist
+from app.utils.cache_utils import LRUCache
+from app.utils.streaming_message import TELEGRAM_MESSAGE_MAX_LENGTH, split_message_text
+
+ARTIST_CARD_SEPARATOR = "\n\n--------------------------------\n\n"
+ARTIST_CARD_CACHE_SIZE = 20_000
 
 
 def display_artist_info(artist: Artist, selected_weekend: str = "") -> str:
     return str(artist.__str__(selected_weekend))
+
+
+class ArtistCardCache:
+    def __init__(self, max_size: int = ARTIST_CARD_CACHE_SIZE):
+        """
+        Cache of the rendered HTML cards of the lineup artists, shared by all the users.
+
+        A card depends on the artist, the selected weekend and the user's songs number, so users with the same
+        artist and weekend share it. The cache is cleared when the lineup version changes.
+
+        Args:
+            max_size (int): The maximal number of cached cards.
+        """
+        self._cards = LRUCache(max_size=max_size)
+        self._lineup_version = None
+        self._lock = threading.Lock()
+
+    def render(self, artist: Artist, selected_weekend: str, lineup_version: int) -> str:
+        """
+        Get the card of an artist for a weekend selection.
+
+        Args:
+            artist (Artist): The artist, with the user's songs number.
+            selected_weekend (str): The selected weekend, or "both".
+            lineup_version (int): The version of the lineup snapshot the artist comes from.
+
+        Returns:
+            str: The HTML card.
+        """
+        with self._lock:
+            if lineup_version != self._lineup_version:
+                self._cards.clear()
+                self._lineup_version = lineup_version
+        key = (lineup_version, artist.name, selected_weekend.lower(), artist.songs_num, artist.spotify_link)
+        card = self._cards.get(key)
+        if card is None:
+            card = display_artist_info(artist, selected_weekend)
+            self._cards.set(key, card)
+        return card
+
+
+def pack_messages(cards: list[str], separator: str = ARTIST_CARD_SEPARATOR,
+                  max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH) -> list[str]:
+    """
+    Pack cards into as few messages as possible, keeping their order. Each message is filled with cards up
+    to the Telegram message length limit. A card too long for a message on its own is split.
+
+    Args:
+        cards (list[str]): The rendered cards.
+        separator (str): The text between two cards of a message.
+        max_length (int): The maximal length of a message.
+
+    Returns:
+        list[str]: The message texts.
+    """
+    messages: list[str] = []
+    current = ""
+    for card in cards:
+        if current and len(current) + len(separator) + len(card) <= max_length:
+            current += separator + card
+            continue
+        if current:
+            messages.append(current)
+        current = card
+        while len(current) > max_length:
+            message, current = split_message_text(current, max_length)
+            messages.append(message)
+    if current:
+        messages.append(current)
+    return messages
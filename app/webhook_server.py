@@ -0,0 +1,132 @@
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_WEBHOOK_PATH = "/telegram"
+HEALTH_CHECK_PATH = "/health"
+
+
+class WebhookServer:
+    def __init__(self, process_update: Callable[[dict], None], secret_token: str, host: str = "0.0.0.0",
+                 port: int = 8080, path: str = DEFAULT_WEBHOOK_PATH, max_queued_updates: int = 1000):
+        """
+        HTTP server that receives Telegram updates as webhook POSTs.
+
+        Requests are checked against the secret token Telegram sends in the 'X-Telegram-Bot-Api-Secret-Token'
+        header, acknowledged right away and queued. A single consumer thread passes the queued updates to
+        'process_update', which is expected to hand them over to the worker pool quickly.
+
+        Nothing here talks to Telegram, so the server can be tested locally by POSTing recorded updates:
+            curl -X POST -H "X-Telegram-Bot-Api-Secret-Token: <secret>" -d @update.json localhost:8080/telegram
+
+        Args:
+            process_update (Callable[[dict], None]): Called with the JSON of each update.
+            secret_token (str): The secret token the webhook was registered with.
+            host (str): The address to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+            path (str): The URL path Telegram posts the updates to.
+            max_queued_updates (int): Updates beyond this are refused with 503, so Telegram retries them later.
+        """
+        self.process_update = process_update
+        self.secret_token = secret_token
+        self.path = path
+        self.updates: queue.Queue = queue.Queue(maxsize=max_queued_updates)
+        self.httpd = ThreadingHTTPServer((host, port), self._create_request_handler())
+        self.httpd.daemon_threads = True
+        self._consumer: Optional[threading.Thread] = None
+        self._serve_thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def serve_forever(self) -> None:
+        """
+        Start consuming updates and serve requests until 'shutdown' is called.
+        """
+        self._start_consumer()
+        logger.info(f"Webhook server listening on port {self.port}, path {self.path}")
+        self.httpd.serve_forever()
+
+    def start(self) -> None:
+        """
+        Serve requests in a background thread.
+        """
+        self._serve_thread = threading.Thread(target=self.serve_forever, name="webhook-server", daemon=True)
+        self._serve_thread.start()
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._consumer is not None:
+            self.updates.put(None)
+            self._consumer.join()
+            self._consumer = None
+
+    def _start_consumer(self) -> None:
+        if self._consumer is None:
+            self._consumer = threading.Thread(target=self._consume_updates, name="webhook-updates", daemon=True)
+            self._consumer.start()
+
+    def _consume_updates(self) -> None:
+        while True:
+            update = self.updates.get()
+            if update is None:
+                return
+            try:
+                self.process_update(update)
+            except Exception as e:
+                logger.exception(f"Error processing update {update.get('update_id')}: {str(e)}")
+
+    def _create_request_handler(self) -> type:
+        server = self
+
+        class WebhookRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                self._reply(200 if self.path == HEALTH_CHECK_PATH else 404)
+
+            def do_POST(self) -> None:
+                if self.path != server.path:
+                    self._reply(404)
+                    return
+                # Compared as bytes, since 'compare_digest' refuses non-ASCII strings
+                secret_token = self.headers.get(SECRET_TOKEN_HEADER, "")
+                if not hmac.compare_digest(secret_token.encode(), server.secret_token.encode()):
+                    logger.warning(f"Webhook request with a wrong secret token from {self.client_address[0]}")
+                    self._reply(403)
+                    return
+
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    update = json.loads(self.rfile.read(length))
+                except (ValueError, json.JSONDecodeError):
+                    self._reply(400)
+                    return
+                if not isinstance(update, dict):
+                    self._reply(400)
+                    return
+
+                try:
+                    server.updates.put_nowait(update)
+                except queue.Full:
+                    logger.warning("Webhook update queue is full, asking Telegram to retry")
+                    self._reply(503)
+                    return
+                self._reply(200)
+
+            def _reply(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug(format % args)
+
+        return WebhookRequestHandler
@@ -0,0 +1,123 @@
+"""
+Benchmark of the exact and fuzzy lineup matchers.
+
+Builds a synthetic 700-act lineup and a labeled playlist with exact names, case and accent variants,
+collaborators of b2b / '&' acts, typos and artists that are not in the lineup, then reports precision,
+recall and latency of each matcher.
+
+Usage (from the project root):
+    python -m benchmarks.bench_artist_matching
+"""
+import random
+import statistics
+import time
+from typing import List, Optional
+
+from app.models.artist_model import Artist
+from app.utils.artist_matching import LineupIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "ve", "to", "ne", "sa", "di", "mo", "ze", "lu", "ar", "in", "ox", "el"]
+ACCENTS = {"a": "á", "e": "é", "i": "í", "o": "ö", "u": "ü"}
+LINEUP_SIZE = 700
+PLAYLIST_SIZE = 5000
+
+
+def random_name(rng: random.Random) -> str:
+    words = [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        for _ in range(rng.randint(1, 2))
+    ]
+    return " ".join(words)
+
+
+def add_typo(name: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(name) - 1)
+    return name[:position] + name[position + 1:]
+
+
+def build_corpus(seed: int = 7) -> tuple[List[Artist], List[tuple[str, Optional[str]]]]:
+    """
+    Build the lineup and the labeled playlist.
+
+    Returns:
+        tuple: The lineup artists, and (playlist artist name, expected lineup name or None) pairs.
+    """
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < LINEUP_SIZE:
+        name = random_name(rng)
+        if rng.random() < 0.1:
+            name = f"{name} {rng.choice(['&', 'b2b'])} {random_name(rng)}"
+        names.add(name)
+    lineup_names = sorted(names)
+    lineup = [Artist(name, "Mainstage", "weekend 1", "date") for name in lineup_names]
+
+    labeled = []
+    for _ in range(PLAYLIST_SIZE):
+        kind = rng.random()
+        name = rng.choice(lineup_names)
+        if kind < 0.15:
+            labeled.append((name, name))
+        elif kind < 0.25:
+            labeled.append((name.upper(), name))
+        elif kind < 0.35:
+            labeled.append(("".join(ACCENTS.get(char, char) for char in name), name))
+        elif kind < 0.42 and (" & " in name or " b2b " in name):
+            labeled.append((name.replace(" b2b ", " & ").split(" & ")[0], name))
+        elif kind < 0.50 and len(name) > 8:
+            labeled.append((add_typo(name, rng), name))
+        else:
+            labeled.append((random_name(rng) + " " + rng.choice(["Band", "Trio", "Project"]), None))
+    return lineup, labeled
+
+
+def legacy_match(playlist_artists: List[Artist], lineup: List[Artist]) -> List[Artist]:
+    """The nested-loop matcher that the bot used before the lineup index."""
+    return [
+        lineup_artist for playlist_artist in playlist_artists
+        for lineup_artist in lineup
+        if lineup_artist.name.lower() == playlist_artist.name.lower()
+    ]
+
+
+def evaluate(index: LineupIndex, labeled: List[tuple[str, Optional[str]]]) -> tuple[float, float, float]:
+    true_positives = false_positives = expected_matches = 0
+    latencies = []
+    for name, expected in labeled:
+        start = time.perf_counter()
+        positions = index.lookup(name)
+        latencies.append(time.perf_counter() - start)
+        found = {index.artists[position].name for position in positions}
+        expected_matches += expected is not None
+        true_positives += expected in found
+        false_positives += len(found - {expected})
+    precision = true_positives / max(true_positives + false_positives, 1)
+    recall = true_positives / max(expected_matches, 1)
+    return precision, recall, statistics.median(latencies) * 1e6
+
+
+def main() -> None:
+    lineup, labeled = build_corpus()
+    playlist = [Artist(name, "none", "none", "none", songs_num=1) for name, _ in labeled]
+
+    start = time.perf_counter()
+    legacy_match(playlist, lineup)
+    legacy_seconds = time.perf_counter() - start
+    print(f"Legacy nested loops: {legacy_seconds * 1000:.1f} ms for {PLAYLIST_SIZE} playlist artists")
+
+    print(f"{'matcher':<18}{'build ms':>10}{'match ms':>10}{'p50 us':>10}{'precision':>11}{'recall':>9}")
+    for label, fuzzy in [("exact", False), ("fuzzy (0.75)", True)]:
+        start = time.perf_counter()
+        index = LineupIndex(lineup, fuzzy=fuzzy)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        index.match(playlist)
+        match_ms = (time.perf_counter() - start) * 1000
+
+        precision, recall, median_us = evaluate(index, labeled)
+        print(f"{label:<18}{build_ms:>10.1f}{match_ms:>10.1f}{median_us:>10.1f}{precision:>11.3f}{recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
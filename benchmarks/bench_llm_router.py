@@ -0,0 +1,75 @@
+"""
+Latency and availability of the LLM provider router, with local fake providers.
+
+The primary provider usually answers in 50 ms but has a slow tail and fails sometimes; the secondary one
+answers in 80 ms. Requests are sent through the router with and without hedging, and with the primary down
+to check that its circuit opens and the secondary takes over.
+
+Usage (from the project root):
+    python -m benchmarks.bench_llm_router
+"""
+import random
+import time
+from typing import Iterator
+
+from AI.llm_router import ProviderRouter, ProviderUnavailableError
+from tests.fakes import FakeProvider
+
+REQUESTS = 300
+
+
+class TailLatencyProvider(FakeProvider):
+    def __init__(self, name: str, latency_seconds: float, slow_seconds: float, slow_rate: float,
+                 failure_rate: float, seed: int):
+        super().__init__(name, latency_seconds, failure_rate, seed=seed)
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self._latency_random = random.Random(seed + 1)
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.latency_seconds = self.slow_seconds if self._latency_random.random() < self.slow_rate else 0.05
+        return super().generate(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        yield self.generate(prompt)
+
+
+def run(router: ProviderRouter) -> tuple[list[float], int]:
+    latencies, errors = [], 0
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        try:
+            router.generate("prompt")
+        except ProviderUnavailableError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies), errors
+
+
+def report(label: str, latencies: list[float], errors: int, router: ProviderRouter) -> None:
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{label}: p50 {p50:.0f} ms, p99 {p99:.0f} ms, {errors} errors")
+    for name, stats in router.stats().items():
+        print(f"    {name}: {stats}")
+
+
+def main() -> None:
+    def providers():
+        return [TailLatencyProvider("primary", 0.05, slow_seconds=0.6, slow_rate=0.08, failure_rate=0.03, seed=19),
+                FakeProvider("secondary", latency_seconds=0.08)]
+
+    plain = ProviderRouter(providers(), default_deadline=2.0, hedge_percentile=None)
+    report("Without hedging", *run(plain), plain)
+
+    hedged = ProviderRouter(providers(), default_deadline=2.0, hedge_percentile=0.9)
+    report("With hedging   ", *run(hedged), hedged)
+
+    primary_down = ProviderRouter([FakeProvider("primary", failure_rate=1.0), FakeProvider("secondary", 0.01)],
+                                  reset_seconds=60.0)
+    report("Primary down   ", *run(primary_down), primary_down)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Latency and correctness of the local schedule planner, against the Gemini lineup.
+
+The planner is checked against a brute force search over every subset of shows on small random days: both must
+find the same number of known songs, and every planned show must leave enough time to walk to the next one.
+With '--with-gemini', the prompt of the same artists is also sent to Gemini, which only writes up the plan,
+to compare the latency (this needs the API keys and network access).
+
+Usage (from the project root):
+    python -m benchmarks.bench_schedule_planner [--with-gemini]
+"""
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.models.artist_model import Artist
+from app.models.show_model import FESTIVAL_TIMEZONE
+from app.utils.schedule_planner import plan_day, plan_lineup, format_lineup_plan
+from app.utils.stage_distances import StageDistances
+
+STAGES = ["Mainstage", "Freedom", "The Rose Garden", "Core", "Atmosphere", "Crystal Garden", "Elixir"]
+DAYS = [("Friday", "2024-07-19"), ("Saturday", "2024-07-20"), ("Sunday", "2024-07-21")]
+SMALL_DAY_SHOWS = 12
+CORRECTNESS_RUNS = 300
+LATENCY_ARTISTS = 120
+LATENCY_RUNS = 50
+
+
+def random_artists(rng: random.Random, count: int, days: list[tuple[str, str]]) -> list[Artist]:
+    artists = []
+    for i in range(count):
+        day, date = rng.choice(days)
+        start = datetime.fromisoformat(date).replace(tzinfo=FESTIVAL_TIMEZONE) + \
+            timedelta(hours=rng.randint(12, 23), minutes=rng.choice([0, 15, 30, 45]))
+        end = start + timedelta(minutes=rng.choice([30, 45, 60, 90]))
+        artists.append(Artist(f"Artist {i}", rng.choice(STAGES), "weekend 1", f"{day} {date}",
+                              songs_num=rng.randint(1, 15),
+                              start=int(start.timestamp()), end=int(end.timestamp()), day=day))
+    return artists
+
+
+def is_feasible(shows, travel_time) -> bool:
+    ordered = sorted(shows, key=lambda artist_show: artist_show[1].start)
+    return all(first.end + travel_time(first.host_name_and_stage, second.host_name_and_stage) * 60 <= second.start
+               for (_, first), (_, second) in zip(ordered, ordered[1:]))
+
+
+def brute_force_songs(shows, travel_time) -> int:
+    best = 0
+    for size in range(1, len(shows) + 1):
+        for subset in itertools.combinations(shows, size):
+            if is_feasible(subset, travel_time):
+                best = max(best, sum(artist.songs_num for artist, _ in subset))
+    return best
+
+
+def check_correctness(rng: random.Random, travel_time) -> int:
+    mismatches = 0
+    for _ in range(CORRECTNESS_RUNS):
+        shows = [(artist, artist.show) for artist in random_artists(rng, SMALL_DAY_SHOWS, DAYS[:1])]
+        plan = plan_day(shows, travel_time)
+        planned = [(planned_show.artist, planned_show.show) for planned_show in plan]
+        if not is_feasible(planned, travel_time) or \
+                sum(artist.songs_num for artist, _ in planned) != brute_force_songs(shows, travel_time):
+            mismatches += 1
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--with-gemini", action="store_true", help="also time the Gemini lineup")
+    args = parser.parse_args()
+
+    rng = random.Random(14)
+    travel_time = StageDistances().travel_time
+
+    mismatches = check_correctness(rng, travel_time)
+    print(f"Correctness: {CORRECTNESS_RUNS - mismatches}/{CORRECTNESS_RUNS} random days of {SMALL_DAY_SHOWS} shows "
+          f"match the brute force optimum")
+
+    artists = random_artists(rng, LATENCY_ARTISTS, DAYS)
+    started = time.perf_counter()
+    for _ in range(LATENCY_RUNS):
+        plan_text = format_lineup_plan(plan_lineup(artists, ["weekend 1"], travel_time))
+    planner_ms = (time.perf_counter() - started) / LATENCY_RUNS * 1000
+    print(f"Planner: {planner_ms:.2f} ms for {LATENCY_ARTISTS} artists over {len(DAYS)} days")
+
+    if args.with_gemini:
+        from AI import AI_funcs_gemini as Gemini
+        from AI.prompt_builder import build_compact_prompt
+
+        started = time.perf_counter()
+        response = Gemini.get_provider().generate(build_compact_prompt(artists, "weekend 1", StageDistances()))
+        gemini_ms = (time.perf_counter() - started) * 1000
+        print(f"Gemini:  {gemini_ms:.0f} ms ({gemini_ms / planner_ms:.0f}x slower)")
+        print(f"\nPlanner lineup:\n{plan_text}\n\nGemini lineup:\n{response}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} planned days are not optimal")
+
+
+if __name__ == "__main__":
+    main()
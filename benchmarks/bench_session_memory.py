@@ -0,0 +1,100 @@
+"""
+Memory held per idle user session, before and after the compact lineup representation.
+
+"before" keeps every session as a live UserSession with dict-backed copies of the matched lineup artists,
+their weekend selection and the rendered artists string, as the bot did with its 'user_sessions' dict.
+"after" keeps the packed (lineup artist ID, songs number) references of InMemorySessionStore, with slotted
+lineup artists shared by every session.
+
+Usage (from the project root):
+    python -m benchmarks.bench_session_memory
+"""
+import copy
+import random
+import tracemalloc
+
+from app.models.artist_model import Artist
+from app.utils.session_store import InMemorySessionStore
+from tomorrowland_lineup_managment.public_funcs import LineupSnapshot
+from UserSession import UserSession
+
+LINEUP_SIZE = 700
+SESSIONS = 2000
+ARTISTS_PER_SESSION = 80
+STAGES = ["Mainstage", "Freedom", "The Rose Garden", "Core", "Atmosphere", "Crystal Garden", "Elixir"]
+
+
+class LegacyShow:
+    def __init__(self, weekend_number, host_name_and_stage, date):
+        self.weekend_number = weekend_number
+        self.host_name_and_stage = host_name_and_stage
+        self.date = date
+
+    def __str__(self):
+        return f"{self.weekend_number}:\n\nStage and host name: {self.host_name_and_stage}\nDate: {self.date}"
+
+
+class LegacyArtist:
+    def __init__(self, name, host_name_and_stage, weekend, date, songs_num=0, spotify_link=""):
+        self.name = name
+        self.songs_num = songs_num
+        self.show = LegacyShow(weekend, host_name_and_stage, date)
+        self.show2 = None
+        self.spotify_link = spotify_link
+
+    def __str__(self):
+        art_with_spotify = f'<a href="{self.spotify_link}">{self.name}</a>' if self.spotify_link else self.name
+        return f"{art_with_spotify}- Songs number: {self.songs_num}\n{self.show}"
+
+
+def measure(build) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / SESSIONS
+
+
+def main() -> None:
+    rng = random.Random(3)
+    rows = [(f"Artist {i}", "".join(rng.choice(STAGES)), "weekend 1", f"Friday 2024-07-19T{i % 24:02d}:00:00",
+             f"https://open.spotify.com/artist/{i:022d}") for i in range(LINEUP_SIZE)]
+    picks = [rng.sample(range(LINEUP_SIZE), ARTISTS_PER_SESSION) for _ in range(SESSIONS)]
+
+    legacy_lineup = [LegacyArtist(name, stage, weekend, date, spotify_link=link)
+                     for name, stage, weekend, date, link in rows]
+    lineup = tuple(Artist(name, stage, weekend, date, spotify_link=link) for name, stage, weekend, date, link in rows)
+    snapshot = LineupSnapshot(1, lineup, 0.0)
+
+    def build_legacy():
+        sessions = {}
+        for chat_id, positions in enumerate(picks):
+            session = UserSession()
+            session.my_relevant = [copy.copy(legacy_lineup[position]) for position in positions]
+            session.selected_weekend = "weekend 1"
+            session.artists_by_weekend = list(session.my_relevant)
+            session.artists_str = ", ".join(str(artist) for artist in session.my_relevant)
+            sessions[chat_id] = session
+        return sessions
+
+    store = InMemorySessionStore(lambda name: None, lambda: snapshot, max_sessions=SESSIONS)
+
+    def build_compact():
+        for chat_id, positions in enumerate(picks):
+            session = UserSession()
+            session.my_relevant = [copy.copy(lineup[position]) for position in positions]
+            session.selected_weekend = "weekend 1"
+            store.save(chat_id, session)
+        return store
+
+    legacy_bytes = measure(build_legacy)
+    compact_bytes = measure(build_compact)
+    print(f"Per idle session with {ARTISTS_PER_SESSION} matched artists:")
+    print(f"  before: {legacy_bytes:>9,.0f} bytes")
+    print(f"  after:  {compact_bytes:>9,.0f} bytes ({legacy_bytes / compact_bytes:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
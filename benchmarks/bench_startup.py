@@ -0,0 +1,88 @@
+"""
+Cold start of the bot: time to import 'app.telegram_bot' and to handle its first update.
+
+A fresh interpreter is started with '-X importtime'. It imports the bot, feeds it a recorded /start update
+and waits until the handler sends its answer. Nothing reaches Telegram: the bot's send methods are replaced
+in that process only. The slowest imports are listed from the '-X importtime' report, so a heavy SDK that
+starts being imported eagerly again shows up at the top.
+
+Usage (from the project root, with the bot's dependencies and APIs.py available):
+    python -m benchmarks.bench_startup [--max-seconds 2.5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SLOWEST_IMPORTS = 15
+
+START_UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+        "text": "/start",
+        "entities": [{"offset": 0, "length": 6, "type": "bot_command"}],
+    },
+}
+
+CHILD_SCRIPT = f"""
+import json, threading, time
+started = time.perf_counter()
+import app.telegram_bot as telegram_bot
+imported = time.perf_counter()
+handled = threading.Event()
+telegram_bot.bot.send_message = lambda *args, **kwargs: handled.set()
+telegram_bot.bot.send_chat_action = lambda *args, **kwargs: None
+telegram_bot.process_update_json({START_UPDATE!r})
+handled.wait(30)
+print(json.dumps({{"import_seconds": imported - started, "first_update_seconds": time.perf_counter() - started,
+                  "handled": handled.is_set()}}))
+"""
+
+
+def parse_importtime(report: str) -> list[tuple[int, str]]:
+    """
+    Parse the '-X importtime' report into (cumulative microseconds, module) of the top level imports.
+    """
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Nested imports are indented under the module that imported them
+        if not module[1:].startswith(" "):
+            imports.append((int(cumulative), module.strip()))
+    return imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-seconds", type=float, help="fail if the first update takes longer than this")
+    args = parser.parse_args()
+
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise SystemExit(f"The bot failed to start:\n{process.stderr[-3000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+
+    print(f"Import of app.telegram_bot: {result['import_seconds'] * 1000:.0f} ms")
+    print(f"First update handled:       {result['first_update_seconds'] * 1000:.0f} ms"
+          f"{'' if result['handled'] else ' (no answer within 30 seconds)'}")
+    print("\nSlowest top level imports:")
+    for cumulative, module in sorted(parse_importtime(process.stderr), reverse=True)[:SLOWEST_IMPORTS]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    if not result["handled"]:
+        raise SystemExit("The first update was not handled")
+    if args.max_seconds is not None and result["first_update_seconds"] > args.max_seconds:
+        raise SystemExit(f"Startup regression: {result['first_update_seconds']:.2f} s > {args.max_seconds} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Accuracy and throughput of the YouTube title -> artist parser.
+
+Compares the legacy separator split with 'extract_artists_from_items' on a labeled corpus of typical
+YouTube / YouTube Music playlist items, and exits with an error if the parser accuracy drops below
+MIN_ACCURACY.
+
+Usage (from the project root):
+    python -m benchmarks.bench_title_parser
+"""
+import sys
+import time
+
+from app.utils.youtube_funcs import extract_artists_from_items
+
+MIN_ACCURACY = 0.95
+REPEATS = 200
+
+# (title, videoOwnerChannelTitle, expected artists)
+CORPUS = [
+    ("Martin Garrix - Animals", "Spinnin' Records", ["Martin Garrix"]),
+    ("Martin Garrix - Animals (Official Video)", "Martin Garrix", ["Martin Garrix"]),
+    ("Animals", "Martin Garrix - Topic", ["Martin Garrix"]),
+    ("Dimitri Vegas & Like Mike - Mammoth", "Smash The House", ["Dimitri Vegas & Like Mike"]),
+    ("Armin van Buuren x Vini Vici - Great Spirit (Official Music Video)", "Armin van Buuren",
+     ["Armin van Buuren x Vini Vici"]),
+    ("Alesso ft. Tove Lo - Heroes (we could be)", "Alesso", ["Alesso", "Tove Lo"]),
+    ("Avicii - Wake Me Up (feat. Aloe Blacc)", "AviciiOfficialVEVO", ["Avicii", "Aloe Blacc"]),
+    ("Afrojack | Tomorrowland Belgium 2023 - W1", "Tomorrowland", ["Afrojack"]),
+    ("[Premiere] Charlotte de Witte - Overdrive", "KNTXT", ["Charlotte de Witte"]),
+    ("(Live) Amelie Lens - Hypnotized", "Amelie Lens", ["Amelie Lens"]),
+    ("Swedish House Mafia – Don't You Worry Child", "SwedishHouseMafiaVEVO", ["Swedish House Mafia"]),
+    ("Lost Frequencies — Are You With Me", "Lost Frequencies", ["Lost Frequencies"]),
+    ("Reality", "Lost Frequencies - Topic", ["Lost Frequencies"]),
+    ("Hero ft. Someone", "Afrojack", ["Afrojack", "Someone"]),
+    ("Tiësto - The Business", "Tiësto", ["Tiësto"]),
+    ("David Guetta feat. Sia - Titanium", "David Guetta", ["David Guetta", "Sia"]),
+    ("\"Oliver Heldens\" - Gecko", "Oliver Heldens", ["Oliver Heldens"]),
+    ("Adam Beyer b2b Cirez D - Live @ Tomorrowland", "Drumcode", ["Adam Beyer b2b Cirez D"]),
+    ("W&W - Rave Love", "Rave Culture", ["W&W"]),
+    ("Steve Aoki - Pursuit Of Happiness (Extended Steve Aoki Remix) ft. Kid Cudi", "Ultra Music",
+     ["Steve Aoki", "Kid Cudi"]),
+    ("Insomnia", "Faithless - Topic", ["Faithless"]),
+    ("Vintage Culture, Fancy Inc - Bonzai", "Vintage Culture", ["Vintage Culture, Fancy Inc"]),
+    ("Boris Brejcha @ Tomorrowland 2019", "Boris Brejcha", ["Boris Brejcha"]),
+    ("KSHMR - Bazaar (feat. Yves V)", "Dharma Worldwide", ["KSHMR", "Yves V"]),
+    ("Hardwell & Maddix - Here Comes The Night", "Revealed Recordings", ["Hardwell & Maddix"]),
+]
+
+
+def legacy_extract_artist_from_title(title):
+    """The separator split that 'extract_artist_from_title' used before the precompiled parser."""
+    for separator in [' - ', ' | ']:
+        if separator in title:
+            artist, _ = title.split(separator, 1)
+            return artist.strip()
+    return None
+
+
+def main() -> None:
+    items = [{'snippet': {'title': title, 'videoOwnerChannelTitle': channel}} for title, channel, _ in CORPUS]
+    expected = [artists for _, _, artists in CORPUS]
+
+    legacy_results = [[artist] if artist else [] for artist in
+                      (legacy_extract_artist_from_title(title) for title, _, _ in CORPUS)]
+    results = extract_artists_from_items(items)
+
+    legacy_accuracy = sum(r == e for r, e in zip(legacy_results, expected)) / len(CORPUS)
+    accuracy = sum(r == e for r, e in zip(results, expected)) / len(CORPUS)
+    found = sum(len(set(r) & set(e)) for r, e in zip(results, expected))
+    legacy_found = sum(len(set(r) & set(e)) for r, e in zip(legacy_results, expected))
+    total = sum(len(e) for e in expected)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for title, _, _ in CORPUS:
+            legacy_extract_artist_from_title(title)
+    legacy_us = (time.perf_counter() - start) / (REPEATS * len(CORPUS)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        extract_artists_from_items(items)
+    parser_us = (time.perf_counter() - start) / (REPEATS * len(CORPUS)) * 1e6
+
+    print(f"{'parser':<10}{'accuracy':>10}{'artists found':>16}{'us/title':>10}")
+    print(f"{'legacy':<10}{legacy_accuracy:>10.2f}{f'{legacy_found}/{total}':>16}{legacy_us:>10.2f}")
+    print(f"{'batch':<10}{accuracy:>10.2f}{f'{found}/{total}':>16}{parser_us:>10.2f}")
+
+    for (title, channel, artists), result in zip(CORPUS, results):
+        if result != artists:
+            print(f"MISMATCH {title!r} ({channel}): got {result}, expected {artists}")
+    if accuracy < MIN_ACCURACY:
+        sys.exit(f"Parser accuracy {accuracy:.2f} is below {MIN_ACCURACY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+from AI.llm_client import LLMProvider
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name: str, latency_seconds: float = 0.0, failure_rate: float = 0.0,
+                 response: str = "Personalized Lineup for Tomorrowland Festival:", seed: Optional[int] = None):
+        """
+        Local provider that simulates latency and failures, for tests and benchmarks of the router.
+
+        Args:
+            name (str): The provider name.
+            latency_seconds (float): How long a request takes.
+            failure_rate (float): The probability that a request fails.
+            response (str): The response of successful requests.
+            seed (Optional[int]): Seed of the failures, for reproducible runs.
+        """
+        self.name = name
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.response = response
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            fails = self._random.random() < self.failure_rate
+        time.sleep(self.latency_seconds)
+        if fails:
+            raise RuntimeError(f"{self.name} is unavailable")
+        return self.response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.generate(prompt)
+        for position in range(0, len(response), 16):
+            yield response[position:position + 16]
+
+
+class HangingProvider(FakeProvider):
+    def __init__(self, name: str, fail_when_released: bool = False):
+        """
+        Provider that does not answer until it is released, to simulate a provider that hangs.
+
+        Args:
+            name (str): The provider name.
+            fail_when_released (bool): Whether the request fails, instead of answering, once released.
+        """
+        super().__init__(name)
+        self.fail_when_released = fail_when_released
+        self.released = threading.Event()
+
+    def generate(self, prompt: str) -> str:
+        self.released.wait(10)
+        if self.fail_when_released:
+            raise RuntimeError(f"{self.name} failed after hanging")
+        return self.response
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from AI.llm_router import CircuitBreaker, ProviderRouter, ProviderUnavailableError, _Attempt
+from tests.fakes import FakeProvider, HangingProvider
+
+
+def test_falls_back_when_the_primary_hangs():
+    primary = HangingProvider("primary")
+    router = ProviderRouter([primary, FakeProvider("secondary", response="fallback")],
+                            deadlines={"primary": 0.1}, hedge_percentile=None)
+    try:
+        started = time.monotonic()
+        assert router.generate("prompt") == "fallback"
+        assert time.monotonic() - started < 2
+        assert router.stats()["primary"]["timeouts"] == 1
+        assert router.stats()["secondary"]["successes"] == 1
+    finally:
+        primary.released.set()
+
+
+def test_stream_falls_back_when_the_primary_hangs():
+    primary = HangingProvider("primary")
+    router = ProviderRouter([primary, FakeProvider("secondary", response="fallback")], deadlines={"primary": 0.1})
+    try:
+        assert "".join(router.stream("prompt")) == "fallback"
+        assert router.stats()["primary"]["timeouts"] == 1
+    finally:
+        primary.released.set()
+
+
+def test_circuit_opens_then_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    # Only one trial request while the circuit is half open
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow_request()
+
+
+def test_open_circuit_skips_the_primary():
+    router = ProviderRouter([FakeProvider("primary", failure_rate=1.0), FakeProvider("secondary", response="fallback")],
+                            failure_threshold=2, reset_seconds=60, hedge_percentile=None)
+    for _ in range(3):
+        assert router.generate("prompt") == "fallback"
+    stats = router.stats()["primary"]
+    assert stats["failures"] == 2
+    assert stats["rejected"] == 1
+    assert router.breakers["primary"].is_open
+
+
+def test_abandoned_attempt_is_ignored():
+    attempt = _Attempt()
+    assert attempt.abandon()
+    assert attempt.abandoned
+    assert not attempt.finish()
+    assert not attempt.abandon()
+
+
+def test_abandoned_call_does_not_count_when_it_ends():
+    primary = HangingProvider("primary", fail_when_released=True)
+    router = ProviderRouter([primary, FakeProvider("secondary")], deadlines={"primary": 0.1}, hedge_percentile=None)
+    router.generate("prompt")
+    primary.released.set()
+    # Wait for the abandoned call to fail
+    router._executor.shutdown(wait=True)
+
+    stats = router.stats()["primary"]
+    assert stats["timeouts"] == 1
+    assert stats["failures"] == 0
+    assert not router.breakers["primary"].is_open
+
+
+def test_raises_when_every_provider_fails():
+    router = ProviderRouter([FakeProvider("primary", failure_rate=1.0), FakeProvider("secondary", failure_rate=1.0)])
+    with pytest.raises(ProviderUnavailableError, match="primary: primary is unavailable; secondary"):
+        router.generate("prompt")
+    with pytest.raises(ProviderUnavailableError):
+        list(router.stream("prompt"))
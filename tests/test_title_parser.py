@@ -0,0 +1,17 @@
+import pytest
+
+# youtube_funcs reads its API key from the local APIs.py, which is not part of the repository
+pytest.importorskip("APIs")
+
+from app.utils.youtube_funcs import extract_artist_from_title, extract_artists_from_items  # noqa: E402
+from benchmarks.bench_title_parser import CORPUS  # noqa: E402
+
+
+@pytest.mark.parametrize("title, channel, expected", CORPUS, ids=[title for title, _, _ in CORPUS])
+def test_extracts_the_artists_of_a_playlist_item(title, channel, expected):
+    items = [{'snippet': {'title': title, 'videoOwnerChannelTitle': channel}}]
+    assert extract_artists_from_items(items) == [expected]
+
+
+def test_title_without_artists():
+    assert extract_artist_from_title("Reality") is None
@@ -0,0 +1,82 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from app.webhook_server import DEFAULT_WEBHOOK_PATH, HEALTH_CHECK_PATH, SECRET_TOKEN_HEADER, WebhookServer
+
+SECRET_TOKEN = "secret"
+# A /start message as posted by Telegram
+RECORDED_UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+        "text": "/start",
+        "entities": [{"offset": 0, "length": 6, "type": "bot_command"}],
+    },
+}
+
+
+@pytest.fixture
+def webhook():
+    updates = []
+    received = threading.Event()
+
+    def process_update(update: dict) -> None:
+        updates.append(update)
+        received.set()
+
+    server = WebhookServer(process_update, SECRET_TOKEN, host="127.0.0.1", port=0)
+    server.start()
+    yield server, updates, received
+    server.shutdown()
+
+
+def request(server: WebhookServer, method: str, path: str, body: bytes = b"", headers: dict = None) -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        connection.putrequest(method, path)
+        for name, value in (headers or {}).items():
+            # putheader encodes str values as latin-1, like a client sending non-ASCII bytes
+            connection.putheader(name, value)
+        connection.putheader("Content-Length", str(len(body)))
+        connection.endheaders(body)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def test_recorded_update_is_accepted_and_processed(webhook):
+    server, updates, received = webhook
+    status = request(server, "POST", DEFAULT_WEBHOOK_PATH, json.dumps(RECORDED_UPDATE).encode(),
+                     {SECRET_TOKEN_HEADER: SECRET_TOKEN})
+    assert status == 200
+    assert received.wait(5)
+    assert updates == [RECORDED_UPDATE]
+
+
+@pytest.mark.parametrize("secret_token", [None, "wrong", "sécret"])
+def test_wrong_secret_token_is_refused(webhook, secret_token):
+    server, updates, _ = webhook
+    headers = {SECRET_TOKEN_HEADER: secret_token} if secret_token is not None else {}
+    assert request(server, "POST", DEFAULT_WEBHOOK_PATH, json.dumps(RECORDED_UPDATE).encode(), headers) == 403
+    assert updates == []
+
+
+@pytest.mark.parametrize("body", [b"not json", b"[1, 2]"])
+def test_invalid_update_is_refused(webhook, body):
+    server, updates, _ = webhook
+    assert request(server, "POST", DEFAULT_WEBHOOK_PATH, body, {SECRET_TOKEN_HEADER: SECRET_TOKEN}) == 400
+    assert updates == []
+
+
+def test_unknown_path_is_not_found(webhook):
+    server, _, _ = webhook
+    assert request(server, "POST", "/other", json.dumps(RECORDED_UPDATE).encode(),
+                   {SECRET_TOKEN_HEADER: SECRET_TOKEN}) == 404
+    assert request(server, "GET", "/other") == 404
+    assert request(server, "GET", HEALTH_CHECK_PATH) == 200
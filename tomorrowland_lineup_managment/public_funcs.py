@@ -1,147 +1,312 @@
-import logging
 import json
-from urllib import response
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
 
 import requests
-import types
 from app.models.artist_model import Artist
-import csv
-import os
+from app.models.show_model import FESTIVAL_TIMEZONE
+from tomorrowland_lineup_managment.show_index import ShowIntervalIndex
 
 tomorrowland_lineup_weekend_json_files = ['tml2024w1.json', 'tml2024w2.json']
 weekend_names = ["weekend 1", "weekend 2"]
 
+url_w1 = 'https://artist-lineup-cdn.tomorrowland.com/TLBE24-W1-211903bb-da4c-445d-a1b3-6b17479a9fab.json'
+url_w2 = 'https://artist-lineup-cdn.tomorrowland.com/TLBE24-W2-211903bb-da4c-445d-a1b3-6b17479a9fab.json'
+
+# (weekend name, CDN url, local snapshot file name) for each weekend of the lineup
+LINEUP_SOURCES = [
+    (weekend_names[0], url_w1, tomorrowland_lineup_weekend_json_files[0]),
+    (weekend_names[1], url_w2, tomorrowland_lineup_weekend_json_files[1]),
+]
+
+# The last good CDN payloads are saved in the project root, where the local lineup files used to be read from
+SNAPSHOT_DIR = Path(__file__).resolve().parents[1]
+LINEUP_TTL_SECONDS = 15 * 60
+REQUEST_TIMEOUT_SECONDS = 10
+HEADERS = {'User-Agent': 'My App 1.0'}
+
 
-def find_artist_and_update_new_data(artists_list: list[Artist], artist_name: str, songs_num: int, new_date: str,
-                                    other_weekend: str, host_name_and_stage: str):
+def parse_performance_time(value: str, date: str) -> Optional[datetime]:
     """
-    Search for an artist by name in the list of 'artists_list'.
-    If artists already exist, update their data of the other show.
+    Parse a performance 'startTime' / 'endTime' value.
 
     Args:
-        artists_list (List[Artist]): The list of artists to search in.
-        artist_name (str): The name of the artist to find.
-        songs_num (int): The number of songs for the artist.
-        new_date (str): The new date for the other show.
-        other_weekend (str): The weekend number for the other show.
-        host_name_and_stage (str): The host name and stage for the other show.
+        value (str): An ISO timestamp, or a time of day (then 'date' gives the day).
+        date (str): The ISO date of the performance, if known.
+
+    Returns:
+        Optional[datetime]: The parsed time in the festival time zone, or None if it could not be parsed.
     """
-    for artist in artists_list:
-        if artist.name == artist_name:
-            artist.songs_num = songs_num
-            artist.add_new_show(other_weekend, host_name_and_stage, new_date)
-            break
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(f"{date}T{value}")
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=FESTIVAL_TIMEZONE)
+    return parsed.astimezone(FESTIVAL_TIMEZONE)
 
 
-def extract_artists_from_tomorrowland_lineup() -> list[Artist]:
+def get_performance_times(performance: dict) -> tuple[Optional[datetime], Optional[datetime]]:
     """
-    Extract artist data from the Tomorrowland (TML) festival JSON lineup file.
+    Get the start and end of a performance.
+
+    Args:
+        performance (dict): A performance of the lineup JSON.
 
     Returns:
-    List[Artist]: A list of 'Artist' objects containing the extracted data for the artists.
+        tuple[Optional[datetime], Optional[datetime]]: The start and end, or (None, None) if the times could
+        not be parsed.
     """
-    artists: list[Artist] = []
-    url_w1 = 'https://artist-lineup-cdn.tomorrowland.com/TLBE24-W1-211903bb-da4c-445d-a1b3-6b17479a9fab.json'
-    url_w2 = 'https://artist-lineup-cdn.tomorrowland.com/TLBE24-W2-211903bb-da4c-445d-a1b3-6b17479a9fab.json'
+    start = parse_performance_time(performance.get("startTime"), performance.get("date"))
+    end = parse_performance_time(performance.get("endTime"), performance.get("date"))
+    if start is None or end is None:
+        return None, None
+    if end <= start:
+        # Shows that end after midnight
+        end += timedelta(days=1)
+    return start, end
+
+
+def parse_lineup_performances(data: dict, weekend: str, artists_by_name: dict[str, Artist]) -> None:
+    """
+    Parse the performances of one weekend lineup JSON into 'Artist' objects.
+
+    Artists that already appear in 'artists_by_name' (from the other weekend) get their second show updated.
+
+    Args:
+        data (dict): The lineup JSON of a single weekend.
+        weekend (str): The weekend name of the lineup.
+        artists_by_name (dict[str, Artist]): The artists parsed so far, keyed by name. Updated in place.
+    """
+    for performance in data.get("performances", []):
+        name = performance.get("name")
+
+        stage = performance.get("stage", {}).get("name")
+        start_time = performance.get("startTime").split('+')[0]
+        end_time = performance.get("endTime").split('+')[0]
+        day = performance.get("day")
+        time_str = f"{day} {start_time} - {end_time}"
+        # Extract additional artist information if available
+        artist_info = performance.get("artists", [{}])[0]
+        spotify_link = artist_info.get("spotify", "")
+        start_datetime, end_datetime = get_performance_times(performance)
+        start = int(start_datetime.timestamp()) if start_datetime else 0
+        end = int(end_datetime.timestamp()) if end_datetime else 0
+
+        existing_artist = artists_by_name.get(name)
+        if existing_artist:
+            existing_artist.songs_num = 0
+            existing_artist.add_new_show(weekend, stage, time_str, start, end, day)
+        else:
+            artists_by_name[name] = Artist(
+                name=name,
+                host_name_and_stage=stage,
+                weekend=weekend,
+                date=time_str,
+                spotify_link=spotify_link if spotify_link else "",
+                start=start,
+                end=end,
+                day=day,
+            )
+
+
+class LineupSnapshot:
+    def __init__(self, version: int, artists: tuple[Artist, ...], loaded_at: float,
+                 artist_ids: dict[str, int] = None):
+        """
+        An immutable, parsed view of the lineup at a given point in time.
+
+        Args:
+            version (int): Increases every time the lineup content changes.
+            artists (tuple[Artist, ...]): The parsed lineup artists. Must not be mutated by callers.
+            loaded_at (float): The monotonic time the snapshot was last validated against the CDN.
+            artist_ids (dict[str, int]): Artist name -> ID. IDs stay the same across the snapshots of a process,
+                so sessions can refer to lineup artists by ID.
+        """
+        self.version = version
+        self.artists = artists
+        self.loaded_at = loaded_at
+        self.artist_ids = artist_ids if artist_ids is not None else {
+            artist.name: artist_id for artist_id, artist in enumerate(artists)}
+        self._artists_by_id: list[Optional[Artist]] = [None] * len(self.artist_ids)
+        for artist in artists:
+            self._artists_by_id[self.artist_ids[artist.name]] = artist
+        self.show_index = ShowIntervalIndex(artists)
+
+    def get_artist_id(self, artist_name: str) -> Optional[int]:
+        return self.artist_ids.get(artist_name)
+
+    def get_artist_by_id(self, artist_id: int) -> Optional[Artist]:
+        """
+        Get a lineup artist by ID.
+
+        Returns:
+            Optional[Artist]: The shared lineup artist, or None if it is not in this snapshot.
+        """
+        if 0 <= artist_id < len(self._artists_by_id):
+            return self._artists_by_id[artist_id]
+        return None
+
+
+class LineupStore:
+    def __init__(self, sources: list[tuple[str, str, str]] = None, ttl_seconds: float = LINEUP_TTL_SECONDS,
+                 snapshot_dir: Path = SNAPSHOT_DIR):
+        """
+        Process-wide store of the Tomorrowland lineup.
+
+        The lineup is downloaded once and kept in memory as a parsed snapshot. Once the snapshot is older than
+        the TTL it is revalidated in a background thread with conditional requests (ETag / If-Modified-Since),
+        so unchanged lineups cost a 304 instead of a full download. When the CDN is unreachable the last good
+        payload is used, from memory or from the snapshot files on disk.
+
+        Args:
+            sources (list[tuple[str, str, str]]): (weekend name, url, snapshot file name) of each weekend.
+            ttl_seconds (float): How long a snapshot is served before it is revalidated.
+            snapshot_dir (Path): The directory of the on-disk snapshot files.
+        """
+        self.sources = sources if sources is not None else LINEUP_SOURCES
+        self.ttl_seconds = ttl_seconds
+        self.snapshot_dir = snapshot_dir
+        self._snapshot: Optional[LineupSnapshot] = None
+        self._payloads: dict[str, dict] = {}
+        self._validators: dict[str, dict[str, str]] = {}
+        # Append-only, so the IDs of the artists never change while the process runs
+        self._artist_ids: dict[str, int] = {}
+        self._refresh_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def get_snapshot(self) -> LineupSnapshot:
+        """
+        Get the current lineup snapshot, loading it on first use.
+
+        A stale snapshot is still returned immediately while a background refresh is started.
+
+        Returns:
+            LineupSnapshot: The current lineup snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._refresh()
+            return self._snapshot
+
+        # An empty snapshot means nothing could be loaded, so it is retried on every access
+        if not snapshot.artists or time.monotonic() - snapshot.loaded_at > self.ttl_seconds:
+            self._start_background_refresh()
+        return snapshot
+
+    def refresh(self) -> LineupSnapshot:
+        """
+        Revalidate the lineup against the CDN right away.
+
+        Returns:
+            LineupSnapshot: The refreshed lineup snapshot.
+        """
+        with self._refresh_lock:
+            self._refresh()
+        return self._snapshot
+
+    def _start_background_refresh(self) -> None:
+        with self._thread_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, name="lineup-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh(self) -> None:
+        changed = False
+        for weekend, url, filename in self.sources:
+            payload = self._fetch_payload(url)
+            if payload is not None:
+                self._save_payload_to_disk(filename, payload)
+            elif url not in self._payloads:
+                payload = self._load_payload_from_disk(filename)
+            if payload is not None:
+                self._payloads[url] = payload
+                changed = True
+
+        if self._snapshot is not None and not changed:
+            self._snapshot.loaded_at = time.monotonic()
+            return
+
+        artists_by_name: dict[str, Artist] = {}
+        for weekend, url, _ in self.sources:
+            if url in self._payloads:
+                parse_lineup_performances(self._payloads[url], weekend, artists_by_name)
+
+        for name in artists_by_name:
+            self._artist_ids.setdefault(name, len(self._artist_ids))
+
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        # A copy, so the IDs added by later refreshes do not change the snapshots already handed out
+        self._snapshot = LineupSnapshot(version, tuple(artists_by_name.values()), time.monotonic(),
+                                        dict(self._artist_ids))
+        logging.info(f"Lineup snapshot {version} loaded with {len(artists_by_name)} artists")
+
+    def _fetch_payload(self, url: str) -> Optional[dict]:
+        """
+        Fetch a lineup JSON with a conditional request.
+
+        Returns:
+            Optional[dict]: The new payload, or None if it did not change or could not be fetched.
+        """
+        headers = dict(HEADERS)
+        validators = self._validators.get(url, {}) if url in self._payloads else {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
 
-    headers = {'User-Agent': 'My App 1.0'}
-    for url in [url_w1, url_w2]:
         try:
-            # Fetch the JSON data and parse it
-            response = requests.get(url, headers=headers)
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code == 304:
+                return None
             response.raise_for_status()
-            data = response.json()
-
-            # Extract artist information from the JSON data
-            performances = data.get("performances", [])
-            for performance in performances:
-                name = performance.get("name")
-
-                stage = performance.get("stage", {}).get("name")
-                start_time = performance.get("startTime").split('+')[0]
-                end_time = performance.get("endTime").split('+')[0]
-                day = performance.get("day")
-                time = f"{day} {start_time} - {end_time}"
-                # Extract additional artist information if available
-                artist_info = performance.get("artists", [{}])[0]
-                spotify_link = artist_info.get("spotify", "")
-
-                weekend = weekend_names[0] if url == url_w1 else weekend_names[1]
-                artist = Artist(
-                    name=name,
-                    host_name_and_stage=stage,
-                    weekend=weekend,
-                    date=time,
-                    spotify_link=spotify_link if spotify_link else "",
-
-                )
-                matching_artists = [a for a in artists if a.name == artist.name]
-
-                if matching_artists:
-                    find_artist_and_update_new_data(artists, artist.name, 0, time, weekend, stage)
-                else:
-                    artists.append(artist)
-
+            payload = response.json()
         except requests.RequestException as e:
             logging.error(f"Error fetching data: {str(e)}")
+            return None
         except json.JSONDecodeError as e:
             logging.error(f"Error decoding JSON: {str(e)}")
+            return None
+
+        self._validators[url] = {
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+        }
+        return payload
+
+    def _load_payload_from_disk(self, filename: str) -> Optional[dict]:
+        filepath = os.path.join(self.snapshot_dir, filename)
+        try:
+            with open(filepath, "r", encoding="utf-8") as jsonfile:
+                logging.warning(f"Using the local lineup snapshot {filepath}")
+                return json.load(jsonfile)
+        except FileNotFoundError:
+            logging.error(f"Error: File not found - {filepath}")
+        except json.JSONDecodeError as e:
+            logging.error(f"Error decoding JSON in {filepath}: {str(e)}")
+        return None
+
+    def _save_payload_to_disk(self, filename: str, payload: dict) -> None:
+        filepath = os.path.join(self.snapshot_dir, filename)
+        tmp_filepath = filepath + ".tmp"
+        try:
+            with open(tmp_filepath, "w", encoding="utf-8") as jsonfile:
+                json.dump(payload, jsonfile)
+            os.replace(tmp_filepath, filepath)
+        except OSError as e:
+            logging.error(f"Error saving the lineup snapshot {filepath}: {str(e)}")
+
 
-    return artists
-
-# For local file lineup:
-# def extract_artists_from_tomorrowland_lineup() -> list[Artist]:
-#     """
-#     Extract artist data from the Tomorrowland (TML) festival local JSON lineup file.
-#
-#     Returns:
-#     List[Artist]: A list of 'Artist' objects containing the extracted data for the artists.
-#     """
-#     artists: list[Artist] = []
-#     weekend_names = ["Weekend 1", "Weekend 2"]  # Assuming weekend names are the same
-#
-#     parent_dir = os.path.abspath(os.path.join(os.getcwd(), ".."))  # Get parent directory path
-#
-#     for filename in ["tml2024w1.json", "tml2024w2.json"]:  # Assuming specific filenames
-#         filepath = os.path.join(parent_dir, filename)
-#         try:
-#             # Open the JSON file
-#             with open(filepath, "r", encoding="utf-8") as jsonfile:
-#                 data = json.load(jsonfile)
-#
-#                 # Extract artist information from the JSON data
-#                 performances = data.get("performances", [])
-#                 for performance in performances:
-#                     name = performance.get("name")
-#                     stage = performance.get("stage", {}).get("name")
-#                     date = performance.get("date")
-#                     start_time = performance.get("startTime").split('+')[0]
-#                     end_time = performance.get("endTime").split('+')[0]
-#                     day = performance.get("day")
-#
-#                     # Extract additional artist information if available
-#                     artist_info = performance.get("artists", [{}])[0]
-#                     image = artist_info.get("image", "")
-#                     date = f"{day} {start_time} - {end_time}"
-#                     weekend = weekend_names[0] if filename == "tml2024w1.json" else weekend_names[1]
-#
-#                     # Create an 'Artist' object and add it to the artists list
-#                     artist = Artist(
-#                         name=name,
-#                         host_name_and_stage=stage,
-#                         weekend=weekend,
-#                         date=date
-#                     )
-#                     matching_artists = [a for a in artists if a.name == artist.name]
-#
-#                     if matching_artists:
-#                         find_artist_and_update_new_data(artists, artist.name, 0, date, weekend, stage)
-#                     else:
-#                         artists.append(artist)
-#
-#         except FileNotFoundError as e:
-#             logging.error(f"Error: File not found - {filepath}")
-#
-#         except json.JSONDecodeError as e:
-#             logging.error(f"Error decoding JSON in {filepath}: {str(e)}")
-#     return artists
+lineup_store = LineupStore()
@@ -0,0 +1,68 @@
+from typing import Iterable
+
+from app.models.artist_model import Artist
+from app.models.show_model import Show
+
+
+class ShowIntervalIndex:
+    def __init__(self, artists: Iterable[Artist]):
+        """
+        Interval index of the shows of a list of artists, per weekend and festival day.
+
+        The shows of each (weekend, day) are sorted by start time, so a day's plan does not have to scan and sort
+        the whole lineup.
+
+        Args:
+            artists (Iterable[Artist]): The artists whose shows are indexed.
+        """
+        self._artists_by_weekend: dict[str, list[Artist]] = {}
+        self._names_by_weekend: dict[str, set[str]] = {}
+        shows_by_day: dict[tuple[str, str], list[tuple[int, int, Artist, Show]]] = {}
+        for artist in artists:
+            for show in artist.get_shows():
+                weekend = show.weekend_number.lower()
+                weekend_artists = self._artists_by_weekend.setdefault(weekend, [])
+                if not weekend_artists or weekend_artists[-1] is not artist:
+                    weekend_artists.append(artist)
+                if show.start:
+                    shows_by_day.setdefault((weekend, show.day), []).append((show.start, show.end, artist, show))
+
+        self._shows: dict[tuple[str, str], list[tuple[Artist, Show]]] = {}
+        self._starts: dict[tuple[str, str], list[int]] = {}
+        for key, day_shows in shows_by_day.items():
+            day_shows.sort(key=lambda day_show: day_show[0])
+            self._shows[key] = [(artist, show) for _, _, artist, show in day_shows]
+            self._starts[key] = [start for start, _, _, _ in day_shows]
+
+    def filter_on_weekend(self, artists: Iterable[Artist], weekend_name: str) -> list[Artist]:
+        """
+        Keep the artists of a list that perform on a weekend according to this index, e.g. a user's copies of
+        lineup artists checked against the index of the whole lineup. Artists are compared by name.
+
+        Args:
+            artists (Iterable[Artist]): The artists to filter.
+            weekend_name (str): The name of the weekend.
+
+        Returns:
+            list[Artist]: The artists with a show on that weekend, in their original order.
+        """
+        weekend = weekend_name.lower()
+        names = self._names_by_weekend.get(weekend)
+        if names is None:
+            names = self._names_by_weekend[weekend] = {
+                artist.name for artist in self._artists_by_weekend.get(weekend, [])}
+        return [artist for artist in artists if artist.name in names]
+
+    def days(self, weekend_name: str) -> list[str]:
+        """
+        Get the festival days of a weekend that have shows, in chronological order.
+        """
+        weekend = weekend_name.lower()
+        day_keys = [key for key in self._starts if key[0] == weekend]
+        return [day for _, day in sorted(day_keys, key=lambda key: self._starts[key][0])]
+
+    def shows_on_day(self, weekend_name: str, day: str) -> list[tuple[Artist, Show]]:
+        """
+        Get the shows of a festival day, sorted by start time.
+        """
+        return list(self._shows.get((weekend_name.lower(), day), []))